@@ -0,0 +1,144 @@
+"""Columnar agendas: appointments stored as arrays rather
+than as Appt objects, for bulk queries over very large
+collections of calendars.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from appt import Appt, Agenda
+
+EPOCH = datetime(1970, 1, 1)
+ONE_MINUTE = timedelta(minutes=1)
+
+
+def to_minutes(when: datetime) -> int:
+    """Minutes since the epoch; seconds are dropped,
+    as in the textual format of an Appt.
+    """
+    return (when - EPOCH) // ONE_MINUTE
+
+
+def from_minutes(minutes: int) -> datetime:
+    """Inverse of to_minutes"""
+    return EPOCH + timedelta(minutes=int(minutes))
+
+
+class ColumnAgenda:
+    """A collection of appointments stored column by column:
+    start and finish times are int64 arrays of epoch minutes,
+    and each description is an int32 code into a side table of
+    distinct descriptions.  Queries run as NumPy comparisons
+    over whole columns instead of Python loops over Appt objects.
+
+    Usage:
+    agenda = ColumnAgenda.from_appts([
+        Appt(datetime(2018, 3, 15, 13, 30),
+             datetime(2018, 3, 15, 15, 30), "Early afternoon nap"),
+        Appt(datetime(2018, 3, 15, 15, 00),
+             datetime(2018, 3, 15, 16, 00), "Coffee break")])
+    print(agenda.conflicts())
+
+    Expected output:
+    2018-03-15 15:00 15:30 | Early afternoon nap and Coffee break
+    """
+    def __init__(self, starts: np.ndarray, finishes: np.ndarray,
+                 codes: np.ndarray, descs: List[str]):
+        """Columns must have equal length; codes index descs"""
+        assert len(starts) == len(finishes) == len(codes)
+        assert np.all(finishes > starts), "Each finish must be after its start"
+        self.starts = starts
+        self.finishes = finishes
+        self.codes = codes
+        self.descs = descs
+
+    @classmethod
+    def from_appts(cls, appts: Iterable[Appt]) -> 'ColumnAgenda':
+        """Columns from Appt objects, e.g., the elements of an Agenda"""
+        starts, finishes, codes = [], [], []
+        table: Dict[str, int] = {}
+        for appt in appts:
+            starts.append(to_minutes(appt.start))
+            finishes.append(to_minutes(appt.finish))
+            codes.append(table.setdefault(appt.desc, len(table)))
+        return cls(np.array(starts, dtype=np.int64),
+                   np.array(finishes, dtype=np.int64),
+                   np.array(codes, dtype=np.int32),
+                   list(table))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, i: int) -> Appt:
+        """The i'th appointment as an Appt object"""
+        return Appt(from_minutes(self.starts[i]), from_minutes(self.finishes[i]),
+                    self.descs[self.codes[i]])
+
+    def to_agenda(self) -> Agenda:
+        """Materialize as an Agenda of Appt objects"""
+        agenda = Agenda()
+        agenda.elements = [self[i] for i in range(len(self))]
+        return agenda
+
+    def __str__(self) -> str:
+        """Each Appt on a separate line"""
+        return str(self.to_agenda())
+
+    def select(self, which: np.ndarray) -> 'ColumnAgenda':
+        """A ColumnAgenda of the rows picked by an index
+        or boolean array, sharing the description table.
+        """
+        return ColumnAgenda(self.starts[which], self.finishes[which],
+                            self.codes[which], self.descs)
+
+    def sorted(self) -> 'ColumnAgenda':
+        """Copy sorted by start time (stable, like Agenda.sort)"""
+        return self.select(np.argsort(self.starts, kind="stable"))
+
+    def overlapping(self, begin: datetime, end: datetime) -> 'ColumnAgenda':
+        """The appointments that overlap the period [begin, end)"""
+        assert end > begin, \
+            f"Period end ({end}) must be after begin ({begin})"
+        mask = (self.starts < to_minutes(end)) & (self.finishes > to_minutes(begin))
+        return self.select(mask)
+
+    def at(self, when: datetime) -> 'ColumnAgenda':
+        """The appointments in progress at time when"""
+        minute = to_minutes(when)
+        return self.select((self.starts <= minute) & (self.finishes > minute))
+
+    def conflict_pairs(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Index arrays (earlier, later) of every overlapping pair,
+        where earlier comes first in order of start time.
+
+        After sorting by start, the appointments that overlap
+        appointment i from later in the order are exactly those
+        from i+1 up to the first one starting at or after i's
+        finish, so each run is found by one binary search and the
+        runs are expanded into pairs without a Python loop.
+        """
+        order = np.argsort(self.starts, kind="stable")
+        starts = self.starts[order]
+        run_end = np.searchsorted(starts, self.finishes[order], side="left")
+        run_len = np.maximum(run_end - np.arange(1, len(starts) + 1), 0)
+        earlier = np.repeat(np.arange(len(starts)), run_len)
+        # Position of each pair within its run: 0, 1, ... run_len - 1
+        run_first = np.cumsum(run_len) - run_len
+        later = earlier + 1 + np.arange(len(earlier)) - np.repeat(run_first, run_len)
+        return order[earlier], order[later]
+
+    def conflicts(self) -> 'ColumnAgenda':
+        """A ColumnAgenda of the conflicts (overlaps) between
+        each pair of appointments, grouped by the earlier one.
+        """
+        earlier, later = self.conflict_pairs()
+        starts = np.maximum(self.starts[earlier], self.starts[later])
+        finishes = np.minimum(self.finishes[earlier], self.finishes[later])
+        table: Dict[str, int] = {}
+        codes = np.array([table.setdefault(f"{self.descs[a]} and {self.descs[b]}",
+                                           len(table))
+                          for a, b in zip(self.codes[earlier], self.codes[later])],
+                         dtype=np.int32)
+        return ColumnAgenda(starts, finishes, codes, list(table))
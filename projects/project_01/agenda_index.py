@@ -0,0 +1,255 @@
+"""Indexed agendas: point and range queries, and conflicts,
+without rescanning every appointment.
+"""
+
+import bisect
+import heapq
+import math
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from appt import Appt, Agenda
+
+ONE_TICK = timedelta(microseconds=1)
+MIN_REBUILD = 32  # Changes an index absorbs before rebuilding, at least
+
+
+class IndexedAgenda(Agenda):
+    """An Agenda that answers "what is booked at time t" and
+    "what overlaps [a, b)" in O(log n + k) for k answers.
+
+    The index is a sorted array of appointments (by start time)
+    read as an implicit balanced binary tree: the node for a
+    range of the array is its midpoint, annotated with the latest
+    finish time anywhere in that range.  A subtree is skipped
+    when it finishes too early, and its right half is skipped
+    when the node starts too late.
+
+    Changes do not rebuild the tree.  Appointments appended since
+    it was built wait in a short list sorted by start time, and
+    removed ones are noted and skipped, so a query costs
+    O(log n + k + m) for m changes.  Once m exceeds about sqrt(n),
+    the next query merges the changes into a new tree in O(n).
+
+    Usage:
+    agenda = IndexedAgenda()
+    agenda.append(Appt(datetime(2018, 3, 15, 13, 30),
+        datetime(2018, 3, 15, 15, 30), "Early afternoon nap"))
+    agenda.append(Appt(datetime(2018, 3, 15, 15, 00),
+        datetime(2018, 3, 15, 16, 00), "Coffee break"))
+    print(agenda.at(datetime(2018, 3, 15, 15, 15)))
+    print(agenda.overlapping(datetime(2018, 3, 15, 15, 30),
+        datetime(2018, 3, 15, 17, 00)))
+
+    Expected output:
+    2018-03-15 13:30 15:30 | Early afternoon nap
+    2018-03-15 15:00 16:00 | Coffee break
+    2018-03-15 15:00 16:00 | Coffee break
+    """
+    def __init__(self):
+        super().__init__()
+        self._by_start: Optional[List[Appt]] = None  # Built on first query
+        self._max_finish: List[datetime] = []
+        self._added: List[Appt] = []      # Appended since, by start time
+        self._removed: Dict[int, int] = {}  # id -> times removed since
+        self._changes = 0
+
+    def append(self, new_appt: Appt):
+        """Add an appointment, to the index's list of additions"""
+        if self._by_start is not None:
+            bisect.insort_right(self._added, new_appt, key=_start)
+            self._changes += 1
+        return super().append(new_appt)
+
+    def remove(self, appt: Appt):
+        """Remove the first appointment equal to appt (same period)
+        and note its removal from the index
+        """
+        removed = self.elements.pop(self.elements.index(appt))
+        if self._by_start is None:
+            return
+        self._changes += 1
+        for pos, added in enumerate(self._added):
+            if added is removed:
+                del self._added[pos]
+                return
+        self._removed[id(removed)] = self._removed.get(id(removed), 0) + 1
+
+    def _index(self) -> List[Appt]:
+        """The appointments sorted by start time, with
+        self._max_finish annotating each tree node, rebuilt
+        if it has absorbed too many changes.
+        """
+        if self._by_start is None:
+            self._build(sorted(self.elements, key=_start))
+        elif self._changes > max(MIN_REBUILD, math.isqrt(len(self._by_start))):
+            kept = self._without_removed(self._by_start)
+            self._build(list(heapq.merge(kept, self._added, key=_start)))
+        return self._by_start
+
+    def _build(self, by_start: List[Appt]):
+        self._by_start = by_start
+        self._max_finish = [appt.finish for appt in by_start]
+        self._annotate(0, len(by_start))
+        self._added = []
+        self._removed = {}
+        self._changes = 0
+
+    def _without_removed(self, appts: List[Appt]) -> List[Appt]:
+        """appts, less one occurrence per removal since the index was built"""
+        if not self._removed:
+            return appts
+        removed = dict(self._removed)
+        kept = []
+        for appt in appts:
+            if removed.get(id(appt)):
+                removed[id(appt)] -= 1
+            else:
+                kept.append(appt)
+        return kept
+
+    def _annotate(self, lo: int, hi: int) -> Optional[datetime]:
+        """Latest finish in by_start[lo:hi], recorded at the midpoint"""
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        latest = self._max_finish[mid]
+        for child in (self._annotate(lo, mid), self._annotate(mid + 1, hi)):
+            if child is not None and child > latest:
+                latest = child
+        self._max_finish[mid] = latest
+        return latest
+
+    def _search(self, lo: int, hi: int, begin: datetime, end: datetime,
+                found: List[Appt]):
+        """Collect appointments in by_start[lo:hi] that start before
+        end and finish after begin, in order of start time.
+        """
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        if self._max_finish[mid] <= begin:
+            return  # Everything in this range is over before begin
+        self._search(lo, mid, begin, end, found)
+        appt = self._by_start[mid]
+        if appt.start >= end:
+            return  # This one, and everything to its right, starts too late
+        if appt.finish > begin:
+            found.append(appt)
+        self._search(mid + 1, hi, begin, end, found)
+
+    def overlapping(self, begin: datetime, end: datetime) -> Agenda:
+        """The appointments that overlap the period [begin, end)"""
+        assert end > begin, \
+            f"Period end ({end}) must be after begin ({begin})"
+        by_start = self._index()
+        found = []
+        self._search(0, len(by_start), begin, end, found)
+        starting = self._added[:bisect.bisect_left(self._added, end, key=_start)]
+        added = [appt for appt in starting if appt.finish > begin]
+        result = Agenda()
+        result.elements = list(heapq.merge(self._without_removed(found), added,
+                                           key=_start))
+        return result
+
+    def at(self, when: datetime) -> Agenda:
+        """The appointments in progress at time when,
+        i.e., those with start <= when < finish.
+        """
+        # datetime resolution is one microsecond, so starting
+        # before the next tick means starting at or before 'when'
+        return self.overlapping(when, when + ONE_TICK)
+
+
+class LiveAgenda(Agenda):
+    """An Agenda that is always sorted by start time and keeps
+    its conflicts up to date as appointments are added and
+    removed, so reading the conflicts is O(k) for k conflicts.
+
+    Each append or remove costs O(log n + m) comparisons, where m
+    is the number of appointments starting within one appointment
+    length of the changed one, plus the list insertion itself.
+    An appointment object may be in the agenda only once.
+
+    Usage:
+    agenda = LiveAgenda()
+    agenda.append(Appt(datetime(2018, 3, 15, 15, 00),
+        datetime(2018, 3, 15, 16, 00), "Coffee break"))
+    agenda.append(Appt(datetime(2018, 3, 15, 13, 30),
+        datetime(2018, 3, 15, 15, 30), "Early afternoon nap"))
+    print(agenda.conflicts())
+
+    Expected output:
+    2018-03-15 15:00 15:30 | Early afternoon nap and Coffee break
+    """
+    def __init__(self):
+        super().__init__()
+        self._longest = timedelta(0)  # Longest appointment ever added
+        # (id of earlier, id of later) -> their intersection
+        self._conflicts = {}
+        # id of appt -> keys of its entries in self._conflicts
+        self._partners = {}
+
+    def append(self, new_appt: Appt):
+        """Insert in order of start time (after any equal start
+        times, as a stable sort would) and record its conflicts.
+        """
+        assert id(new_appt) not in self._partners, \
+            f"{new_appt} is already in this agenda"
+        self._longest = max(self._longest, new_appt.finish - new_appt.start)
+        pos = bisect.bisect_right(self.elements, new_appt.start, key=_start)
+        self.elements.insert(pos, new_appt)
+        self._partners[id(new_appt)] = set()
+        lo = bisect.bisect_right(self.elements, new_appt.start - self._longest,
+                                 hi=pos, key=_start)
+        hi = bisect.bisect_left(self.elements, new_appt.finish,
+                                lo=pos + 1, key=_start)
+        for earlier in self.elements[lo:pos]:
+            if earlier.finish > new_appt.start:
+                self._record(earlier, new_appt)
+        for later in self.elements[pos + 1:hi]:
+            self._record(new_appt, later)
+
+    def _record(self, earlier: Appt, later: Appt):
+        key = (id(earlier), id(later))
+        self._conflicts[key] = earlier.intersect(later)
+        self._partners[id(earlier)].add(key)
+        self._partners[id(later)].add(key)
+
+    def remove(self, appt: Appt):
+        """Remove the first appointment equal to appt
+        (same period), and its conflicts.
+        """
+        lo = bisect.bisect_left(self.elements, appt.start, key=_start)
+        hi = bisect.bisect_right(self.elements, appt.start, lo=lo, key=_start)
+        for pos in range(lo, hi):
+            if self.elements[pos] == appt:
+                break
+        else:
+            raise ValueError(f"{appt} is not in this agenda")
+        removed = self.elements.pop(pos)
+        for key in self._partners.pop(id(removed)):
+            del self._conflicts[key]
+            for appt_id in key:
+                if appt_id != id(removed):
+                    self._partners[appt_id].discard(key)
+
+    def sort(self):
+        """Always sorted by start time; nothing to do"""
+        pass
+
+    def conflicts(self, workers: int = 1) -> Agenda:
+        """Returns an agenda consisting of the conflicts
+        (overlaps) between each pair of appointments in this
+        agenda, in the order they were discovered.
+        workers is ignored: conflicts are kept up to date as
+        appointments change, so this is already O(k).
+        """
+        conflict_agenda = Agenda()
+        conflict_agenda.elements = list(self._conflicts.values())
+        return conflict_agenda
+
+
+def _start(appt: Appt) -> datetime:
+    """Sort and search key for agendas ordered by start time"""
+    return appt.start
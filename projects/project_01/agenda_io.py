@@ -0,0 +1,93 @@
+"""Reading and writing appointments in the textual format
+of Appt.__str__, one appointment per line:
+    yyyy-mm-dd hh:mm hh:mm | description
+
+Files are processed as streams, so they can be far larger
+than memory.
+"""
+
+from datetime import datetime
+from typing import Iterable, Iterator, TextIO
+import argparse
+import sys
+
+from appt import Appt, sweep_conflicts
+
+
+def parse_appt(line: str) -> Appt:
+    """Inverse of Appt.__str__"""
+    when, bar, desc = line.rstrip("\n").partition("|")
+    fields = when.split()
+    if not bar or len(fields) != 3:
+        raise ValueError(f"Expecting 'yyyy-mm-dd hh:mm hh:mm | description', got '{line.strip()}'")
+    date_iso, start_iso, finish_iso = fields
+    start = datetime.fromisoformat(f"{date_iso}T{start_iso}")
+    finish = datetime.fromisoformat(f"{date_iso}T{finish_iso}")
+    if desc.startswith(" "):
+        desc = desc[1:]
+    return Appt(start, finish, desc)
+
+
+def read_appts(file: TextIO) -> Iterator[Appt]:
+    """Yield the appointments in file one at a time, skipping
+    blank lines.  Memory use does not depend on file size.
+    """
+    for line_num, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield parse_appt(line)
+        except (ValueError, AssertionError) as e:
+            raise ValueError(f"Line {line_num}: {e}") from e
+
+
+def write_appts(file: TextIO, appts: Iterable[Appt]) -> int:
+    """Write each appointment on its own line; returns the count"""
+    count = 0
+    for appt in appts:
+        file.write(f"{appt}\n")
+        count += 1
+    return count
+
+
+def in_start_order(appts: Iterable[Appt]) -> Iterator[Appt]:
+    """Pass appointments through, checking that they arrive
+    sorted by start time.
+    """
+    prior = None
+    for appt in appts:
+        if prior is not None and appt.start < prior.start:
+            raise ValueError(f"Appointments out of order: '{appt}' after '{prior}'")
+        prior = appt
+        yield appt
+
+
+def stream_conflicts(appts: Iterable[Appt]) -> Iterator[Appt]:
+    """Conflicts among appointments arriving sorted by start
+    time, without collecting them into an Agenda.  Only the
+    appointments still in progress are held in memory.
+    """
+    return sweep_conflicts(in_start_order(appts))
+
+
+def cli() -> object:
+    """Command line interface returns an object with
+    an instance variable for each command line argument.
+    """
+    parser = argparse.ArgumentParser(
+        description="Report conflicts in an agenda file sorted by start time")
+    parser.add_argument("agenda", type=argparse.FileType("r"),
+                        nargs="?", default=sys.stdin)
+    parser.add_argument("conflicts", type=argparse.FileType("w"),
+                        nargs="?", default=sys.stdout)
+    return parser.parse_args()
+
+
+def main():
+    args = cli()
+    count = write_appts(args.conflicts, stream_conflicts(read_appts(args.agenda)))
+    print(f"{count} conflicts", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
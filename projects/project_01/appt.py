@@ -1,7 +1,12 @@
 """Josh Jilot
 Appt and Agenda class creation"""
 
-from datetime import datetime
+from datetime import date, datetime
+from typing import Callable, Iterable, Iterator, List
+from concurrent.futures import ProcessPoolExecutor
+import functools
+import heapq
+import itertools
 
 class Appt:
     """An appointment has a start time, an end time, and a title.
@@ -109,6 +114,10 @@ class Agenda:
         """Delegate to append method of wrapped lists"""
         return self.elements.append(new_appt)
 
+    def remove(self, appt: 'Appt'):
+        """Delegate to remove method of wrapped lists"""
+        return self.elements.remove(appt)
+
     def __str__(self):
         """Each Appt on a separate line"""
         lines = [ str(e) for e in self.elements ]
@@ -118,27 +127,74 @@ class Agenda:
         """The constructor does not work this way"""
         return f"Agenda({self.elements})"
 
-    def conflicts(self) -> 'Agenda':
+    def conflicts(self, workers: int = 1) -> 'Agenda':
         """Returns an agenda consisting of the conflicts
-        (overlaps) between this agenda and the other.
+        (overlaps) between each pair of appointments in this agenda.
+        With workers > 1, each day's appointments are checked in
+        a separate process (appointments are on a single day, so
+        conflicts never cross days) and results come back in
+        day order, the same as checking them all at once.
         Side effect: This agenda is sorted
         """
         self.sort()
         conflict_agenda = Agenda()
-        count = 0
-        for appt in self.elements:
-            count = self.elements.index(appt) + 1
-            for other_appt in self.elements[count: len(self.elements)]:
-                if appt.overlaps(other_appt):
-                    conflict_agenda.append(appt.intersect(other_appt))
-                else:
-                    break
+        if workers > 1:
+            days = [list(day) for _, day in
+                    itertools.groupby(self.elements, key=self._day_of)]
+            chunk = max(1, len(days) // (4 * workers))
+            day_conflicts = functools.partial(_day_conflicts, self._sweep)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for conflicts in pool.map(day_conflicts, days, chunksize=chunk):
+                    conflict_agenda.elements.extend(conflicts)
+        else:
+            for conflict in self._sweep(self.elements):
+                conflict_agenda.append(conflict)
         return conflict_agenda
 
     def sort(self):
         """Sort agenda by appointment start times"""
         self.elements.sort(key=lambda appt: appt.start)
 
+    # How conflicts finds the day of an appointment and the conflicts
+    # among sorted appointments; agendas of another kind of appointment
+    # (e.g., compact_appt.CompactAgenda) may substitute their own.
+    @staticmethod
+    def _day_of(appt: Appt) -> date:
+        return appt.start.date()
+
+    @staticmethod
+    def _sweep(appts: Iterable[Appt]) -> Iterator[Appt]:
+        return sweep_conflicts(appts)
+
+def sweep_conflicts(appts: Iterable[Appt]) -> Iterator[Appt]:
+    """Yield the intersection of every overlapping pair of
+    appointments.  The appointments must arrive sorted by start
+    time; each conflict is reported when the later-starting
+    appointment of the pair arrives, paired with the earlier
+    ones in order of their start times.
+
+    A heap of finish times retires appointments that are over,
+    so only the appointments still in progress are compared:
+    O(n log n + k) for n appointments and k conflicts.
+    """
+    finishing = []  # Heap of (finish, seq) for active appointments
+    active = {}     # seq -> appt, in order of arrival (start time)
+    for seq, appt in enumerate(appts):
+        while finishing and finishing[0][0] <= appt.start:
+            _, done = heapq.heappop(finishing)
+            del active[done]
+        for earlier in active.values():
+            yield earlier.intersect(appt)
+        active[seq] = appt
+        heapq.heappush(finishing, (appt.finish, seq))
+
+def _day_conflicts(sweep: Callable[[Iterable[Appt]], Iterator[Appt]],
+                   appts: List[Appt]) -> List[Appt]:
+    """Conflicts within one day's sorted appointments, found
+    by sweep, run in a worker process by Agenda.conflicts.
+    """
+    return list(sweep(appts))
+
 if __name__ == "__main__":
     print("Running usage examples")
     appt1 = Appt(datetime(2018, 3, 15, 13, 30),\
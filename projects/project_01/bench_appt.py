@@ -0,0 +1,213 @@
+"""Benchmarks for appt.py.
+
+Times the Agenda and Appt operations on synthetic agendas of
+several sizes and overlap densities, and reports the results
+as JSON so that runs can be compared for regressions.
+Synthetic agendas depend only on size, density and seed,
+so runs on different days measure the same work.
+
+Run as a script:
+    python bench_appt.py                      # 1k, 100k, 1M appointments
+    python bench_appt.py --sizes 1000 --density 0.5 4 --output bench.json
+    python bench_appt.py --compact --sizes 100000 --density 2   # Appt vs CompactAppt
+"""
+
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import timeit
+import tracemalloc
+
+from appt import Appt, Agenda
+from compact_appt import CompactAgenda, CompactAppt
+
+DAY = datetime(2018, 3, 15)
+DAY_START = 8 * 60         # Appointments fall between 8:00
+DAY_LENGTH = 10 * 60       # and 18:00, in minutes
+SHORTEST, LONGEST = 15, 120
+SIZES = [1_000, 100_000, 1_000_000]
+DENSITIES = [0.5, 2.0]
+
+
+def random_periods(n: int, seed: int = 211) -> List[tuple]:
+    """n (start, finish, desc) triples within one day"""
+    rng = random.Random(seed)
+    periods = []
+    for i in range(n):
+        start = DAY + timedelta(minutes=rng.randrange(0, 23 * 60))
+        finish = start + timedelta(minutes=rng.randrange(1, 60))
+        periods.append((start, finish, f"Appointment {i}"))
+    return periods
+
+
+def synthetic_periods(n: int, density: float, seed: int = 211) -> List[tuple]:
+    """n (start, finish, desc) triples spread over as many days
+    as needed so that on average 'density' appointments are in
+    progress at any moment of the working day.  Returned in
+    random order, as they might arrive from a booking system.
+    """
+    rng = random.Random(seed)
+    mean_length = (SHORTEST + LONGEST) / 2
+    per_day = max(1, round(density * DAY_LENGTH / mean_length))
+    periods = []
+    for i in range(n):
+        day = DAY + timedelta(days=i // per_day)
+        length = rng.randint(SHORTEST, LONGEST)
+        start = day + timedelta(minutes=DAY_START + rng.randrange(DAY_LENGTH - length))
+        periods.append((start, start + timedelta(minutes=length), f"Appointment {i}"))
+    rng.shuffle(periods)
+    return periods
+
+
+def agenda_of(elements: List[Appt], kind: Callable[[], Agenda] = Agenda) -> Agenda:
+    """An agenda (of class kind) holding elements, without
+    appending one by one
+    """
+    agenda = kind()
+    agenda.elements = elements
+    return agenda
+
+
+def time_once(stmt: Callable[[], object]) -> float:
+    """Wall-clock seconds for one call of stmt"""
+    begin = time.perf_counter()
+    stmt()
+    return time.perf_counter() - begin
+
+
+def bench_agenda(n: int, density: float, repeat: int = 3) -> List[dict]:
+    """One result record per operation on a synthetic agenda.
+    Each operation is timed 'repeat' times and the best time
+    is reported, in seconds overall and nanoseconds per item.
+    """
+    periods = synthetic_periods(n, density)
+    appts = [Appt(*period) for period in periods]
+
+    in_order = sorted(appts, key=lambda appt: appt.start)
+    pairs = list(zip(in_order, in_order[1:]))
+    overlapping = [(a, b) for a, b in pairs if a.overlaps(b)]
+    conflict_count = len(agenda_of(list(in_order)).conflicts())
+
+    operations = {
+        # name: (setup returning an argument, timed function, items)
+        "construct": (lambda: periods,
+                      lambda ps: [Appt(*p) for p in ps], n),
+        "sort": (lambda: agenda_of(list(appts)),
+                 lambda agenda: agenda.sort(), n),
+        "conflicts": (lambda: agenda_of(list(in_order)),
+                      lambda agenda: agenda.conflicts(), n + conflict_count),
+        "overlaps": (lambda: pairs,
+                     lambda ps: [a.overlaps(b) for a, b in ps], len(pairs)),
+        "intersect": (lambda: overlapping,
+                      lambda ps: [a.intersect(b) for a, b in ps], len(overlapping)),
+        "str": (lambda: agenda_of(in_order),
+                lambda agenda: str(agenda), n),
+    }
+    records = []
+    for name, (setup, operation, items) in operations.items():
+        best = min(time_once(lambda arg=setup(): operation(arg))
+                   for _ in range(repeat))
+        records.append({"op": name, "n": n, "density": density,
+                        "items": items, "conflicts": conflict_count,
+                        "seconds": best,
+                        "ns_per_item": best / max(1, items) * 1e9})
+    return records
+
+
+def bytes_per_object(cls: Callable, periods: List[tuple]) -> float:
+    """Memory retained per appointment object, including the
+    start and finish datetimes it was built from (each object
+    gets its own, as when parsed from a file) but not the
+    descriptions, which are shared.
+    """
+    no_time = timedelta(0)
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    objs = [cls(start + no_time, finish + no_time, desc)
+            for start, finish, desc in periods]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Discount the list holding them
+    return (after - before) / len(objs) - 8
+
+
+def compare_compact(n: int, density: float,
+                    repeat: int = 3) -> Dict[str, Dict[str, float]]:
+    """Per-object memory (bytes) and per-operation cost (ns)
+    of Appt and CompactAppt on the same n appointments.  Sort
+    and conflicts run on a synthetic agenda of the given
+    density, and conflicts is charged per appointment or
+    conflict (n + k), as in bench_agenda.
+    """
+    periods = random_periods(n)
+    agenda_periods = synthetic_periods(n, density)
+    results = {}
+    for cls, kind in ((Appt, Agenda), (CompactAppt, CompactAgenda)):
+        objs = [cls(*period) for period in periods]
+        pairs = list(zip(objs, objs[1:]))
+        overlapping = [(a, b) for a, b in pairs if a.overlaps(b)]
+        booked = [cls(*period) for period in agenda_periods]
+        in_order = sorted(booked, key=lambda appt: appt.start)
+        conflict_count = len(agenda_of(list(in_order), kind).conflicts())
+
+        def best(stmt: Callable, count: int) -> float:
+            return min(timeit.repeat(stmt, number=1, repeat=repeat)) / count * 1e9
+
+        results[cls.__name__] = {
+            "bytes": bytes_per_object(cls, periods),
+            "lt": best(lambda: [a < b for a, b in pairs], len(pairs)),
+            "overlaps": best(lambda: [a.overlaps(b) for a, b in pairs], len(pairs)),
+            "intersect": best(lambda: [a.intersect(b) for a, b in overlapping],
+                              max(1, len(overlapping))),
+            "construct": best(lambda: [cls(*period) for period in periods], n),
+            "sort": best(lambda: agenda_of(list(booked), kind).sort(), n),
+            "conflicts": best(lambda: agenda_of(list(in_order), kind).conflicts(),
+                              n + conflict_count),
+        }
+    return results
+
+
+def cli() -> object:
+    """Command line interface returns an object with
+    an instance variable for each command line argument.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark appt.py")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES,
+                        help="Numbers of appointments")
+    parser.add_argument("--density", type=float, nargs="+", default=DENSITIES,
+                        help="Mean number of appointments in progress at once")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Report the best of this many runs")
+    parser.add_argument("--output", type=argparse.FileType("w"), default=sys.stdout,
+                        help="Where to write JSON results")
+    parser.add_argument("--compact", action="store_true",
+                        help="Compare Appt with CompactAppt instead")
+    return parser.parse_args()
+
+
+def main():
+    args = cli()
+    records = []
+    for n in args.sizes:
+        for density in args.density:
+            print(f"Benchmarking {n} appointments at density {density}", file=sys.stderr)
+            if args.compact:
+                # bytes per object, nanoseconds per operation
+                for name, costs in compare_compact(n, density, args.repeat).items():
+                    records.append({"class": name, "n": n, "density": density, **costs})
+            else:
+                records.extend(bench_agenda(n, density, args.repeat))
+    report = {"python": platform.python_version(),
+              "machine": platform.machine(),
+              "results": records}
+    json.dump(report, args.output, indent=2)
+    args.output.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""A compact variant of Appt for very large agendas."""
+
+from datetime import datetime, timedelta
+from operator import attrgetter
+from typing import Iterable, Iterator, Tuple, Union
+import heapq
+
+from appt import Agenda
+
+ONE_MICROSECOND = timedelta(microseconds=1)
+MICROSECONDS_PER_DAY = 86_400_000_000
+
+
+def time_key(when: datetime) -> int:
+    """An integer that orders like the datetime: microseconds
+    since datetime.min.  (For naive times only, like Appt,
+    which is meant for times on a single day.)
+    """
+    return (when - datetime.min) // ONE_MICROSECOND
+
+
+def key_time(key: int) -> datetime:
+    """Inverse of time_key"""
+    return datetime.min + key * ONE_MICROSECOND
+
+
+# A description, or for an intersection not yet described,
+# the pair of descriptions of the appointments it came from
+Description = Union[str, Tuple["Description", "Description"]]
+
+
+def describe(desc: Description) -> str:
+    """The text of a description: '<first> and <second>' for a pair"""
+    if isinstance(desc, tuple):
+        first, second = desc
+        return f"{describe(first)} and {describe(second)}"
+    return desc
+
+
+class CompactAppt:
+    """Same interface as Appt, but with no per-object __dict__,
+    holding integer keys instead of datetime objects, so that
+    comparisons are integer comparisons; start and finish are
+    rebuilt as datetimes when read.  The description of an
+    intersection is built only when it is first read (see
+    Description).
+
+    Usage example:
+        appt1 = CompactAppt(datetime(2018, 3, 15, 13, 30),
+                    datetime(2018, 3, 15, 15, 30), "Early afternoon nap")
+        appt2 = CompactAppt(datetime(2018, 3, 15, 15, 00),
+                    datetime(2018, 3, 15, 16, 00), "Coffee break")
+        print(appt1.intersect(appt2))
+    Should print:
+        2018-03-15 15:00 15:30 | Early afternoon nap and Coffee break
+    """
+    __slots__ = ("start_key", "finish_key", "_desc")
+
+    def __init__(self, start: datetime, finish: datetime, desc: str):
+        """An appointment from start time to finish time, with description desc.
+        Start and finish should be the same day.
+        """
+        assert finish > start,\
+        f"Period finish ({finish}) must be after start ({start})"
+        self.start_key = time_key(start)
+        self.finish_key = time_key(finish)
+        self._desc: Description = desc
+
+    @classmethod
+    def from_keys(cls, start_key: int, finish_key: int,
+                  desc: Description) -> 'CompactAppt':
+        """Construct from time_key values, skipping datetime arithmetic"""
+        assert finish_key > start_key,\
+        f"Period finish ({finish_key}) must be after start ({start_key})"
+        appt = cls.__new__(cls)
+        appt.start_key = start_key
+        appt.finish_key = finish_key
+        appt._desc = desc
+        return appt
+
+    @property
+    def start(self) -> datetime:
+        return key_time(self.start_key)
+
+    @property
+    def finish(self) -> datetime:
+        return key_time(self.finish_key)
+
+    @property
+    def desc(self) -> str:
+        """For an intersection, '<first desc> and <second desc>',
+        built on first use from the descriptions the two had when
+        they were intersected.
+        """
+        if isinstance(self._desc, tuple):
+            self._desc = describe(self._desc)
+        return self._desc
+
+    @desc.setter
+    def desc(self, desc: str):
+        self._desc = desc
+
+    def __eq__(self, other: 'CompactAppt') -> bool:
+        """Equality means same time period, ignoring description"""
+        return self.start_key == other.start_key and \
+            self.finish_key == other.finish_key
+
+    __hash__ = None   # Like Appt, which defines __eq__ only
+
+    def __lt__(self, other: 'CompactAppt') -> bool:
+        """A before b means a finish time is <= b start time."""
+        return self.finish_key <= other.start_key
+
+    def __gt__(self, other: 'CompactAppt') -> bool:
+        """A after b means a start time is >= b finish time."""
+        return self.start_key >= other.finish_key
+
+    def overlaps(self, other: 'CompactAppt') -> bool:
+        """Is there a non-zero overlap between these periods?"""
+        return self.start_key < other.finish_key and \
+            other.start_key < self.finish_key
+
+    def intersect(self, other: 'CompactAppt') -> 'CompactAppt':
+        """The overlapping portion of two CompactAppt objects"""
+        assert self.overlaps(other) # Precondition
+        start_key = max(self.start_key, other.start_key)
+        finish_key = min(self.finish_key, other.finish_key)
+        # Their descriptions, not the appointments themselves, so
+        # that the intersection does not keep them alive
+        return CompactAppt.from_keys(start_key, finish_key, (self._desc, other._desc))
+
+    def __str__(self) -> str:
+        """The textual format of an appointment is
+        yyyy-mm-dd hh:mm hh:mm | description
+        Note that this is accurate only if start and finish
+        are on the same day.
+        """
+        start, finish = self.start, self.finish
+        date_iso = start.date().isoformat()
+        start_iso = start.time().isoformat(timespec='minutes')
+        finish_iso = finish.time().isoformat(timespec='minutes')
+        return f"{date_iso} {start_iso} {finish_iso} | {self.desc}"
+
+    def __repr__(self) -> str:
+        return f"CompactAppt({repr(self.start)}, {repr(self.finish)}, " \
+               f"{repr(self.desc)})"
+
+
+class CompactAgenda(Agenda):
+    """An Agenda of CompactAppt objects, which it sorts and
+    checks for conflicts by their integer keys rather than
+    rebuilding their start and finish datetimes.
+    """
+
+    def sort(self):
+        """Sort agenda by appointment start times"""
+        self.elements.sort(key=attrgetter("start_key"))
+
+    @staticmethod
+    def _day_of(appt: CompactAppt) -> int:
+        return appt.start_key // MICROSECONDS_PER_DAY
+
+    @staticmethod
+    def _sweep(appts: Iterable[CompactAppt]) -> Iterator[CompactAppt]:
+        return sweep_compact_conflicts(appts)
+
+
+def sweep_compact_conflicts(appts: Iterable[CompactAppt]) -> Iterator[CompactAppt]:
+    """As appt.sweep_conflicts, for CompactAppt objects sorted
+    by start time, comparing their integer keys
+    """
+    finishing = []  # Heap of (finish_key, seq) for active appointments
+    active = {}     # seq -> appt, in order of arrival (start time)
+    for seq, appt in enumerate(appts):
+        start_key = appt.start_key
+        while finishing and finishing[0][0] <= start_key:
+            _, done = heapq.heappop(finishing)
+            del active[done]
+        for earlier in active.values():
+            yield earlier.intersect(appt)
+        active[seq] = appt
+        heapq.heappush(finishing, (appt.finish_key, seq))
@@ -0,0 +1,88 @@
+"""Finding a common free period in many agendas,
+e.g., to schedule a meeting with many attendees.
+"""
+
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+import heapq
+
+from appt import Appt, Agenda
+
+
+def busy_periods(agendas: Iterable[Agenda]) -> Iterable[Appt]:
+    """All appointments of all agendas, in order of start time.
+    Each agenda is sorted (a side effect, as for Agenda.conflicts)
+    and the sorted agendas are merged in a single k-way heap pass.
+    """
+    sorted_lists = []
+    for agenda in agendas:
+        agenda.sort()
+        sorted_lists.append(agenda.elements)
+    return heapq.merge(*sorted_lists, key=lambda appt: appt.start)
+
+
+def earliest_free(agendas: Iterable[Agenda], length: timedelta,
+                  after: datetime, before: Optional[datetime] = None
+                  ) -> Optional[Appt]:
+    """The earliest period of the given length, starting no
+    earlier than after (and finishing no later than before,
+    if given), in which no appointment of any agenda takes place.
+    Returns None if there is no such period.
+
+    Busy periods are visited in order of start time while
+    tracking the latest finish seen so far, so the first gap
+    at least 'length' long is the answer: O(n log N) for n
+    appointments in N agendas.
+
+    Usage:
+    mine = Agenda()
+    mine.append(Appt(datetime(2018, 3, 15, 9, 00),
+                     datetime(2018, 3, 15, 10, 00), "Lecture"))
+    yours = Agenda()
+    yours.append(Appt(datetime(2018, 3, 15, 9, 30),
+                      datetime(2018, 3, 15, 11, 00), "Lab"))
+    print(earliest_free([mine, yours], timedelta(minutes=30),
+                        after=datetime(2018, 3, 15, 8, 30)))
+    print(earliest_free([mine, yours], timedelta(hours=1),
+                        after=datetime(2018, 3, 15, 8, 30)))
+    print(earliest_free([mine, yours], timedelta(hours=1),
+                        after=datetime(2018, 3, 15, 8, 30),
+                        before=datetime(2018, 3, 15, 11, 30)))
+
+    Expected output:
+    2018-03-15 08:30 09:00 | Free
+    2018-03-15 11:00 12:00 | Free
+    None
+    """
+    assert length > timedelta(0), f"Length ({length}) must be positive"
+    free_from = after
+    for busy in busy_periods(agendas):
+        if busy.start - free_from >= length:
+            break   # Gap before this appointment is long enough
+        if busy.finish > free_from:
+            free_from = busy.finish
+        if before is not None and free_from + length > before:
+            return None
+    if before is not None and free_from + length > before:
+        return None
+    return Appt(free_from, free_from + length, "Free")
+
+
+def free_periods(agendas: Iterable[Agenda], after: datetime,
+                 before: datetime) -> List[Appt]:
+    """Every maximal period between after and before in
+    which no appointment of any agenda takes place.
+    """
+    assert before > after, f"Period end ({before}) must be after start ({after})"
+    result = []
+    free_from = after
+    for busy in busy_periods(agendas):
+        if busy.start >= before:
+            break
+        if busy.start > free_from:
+            result.append(Appt(free_from, busy.start, "Free"))
+        if busy.finish > free_from:
+            free_from = busy.finish
+    if free_from < before:
+        result.append(Appt(free_from, before, "Free"))
+    return result
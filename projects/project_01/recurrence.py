@@ -0,0 +1,185 @@
+"""Recurring appointments, expanded lazily: only the
+occurrences inside a window of interest are ever built.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Iterator, List, Optional
+import heapq
+
+from appt import Appt, Agenda, sweep_conflicts
+
+ONE_DAY = timedelta(days=1)
+SATURDAY = 5
+
+
+class Recurrence:
+    """Abstract base class for rules that say on which dates
+    a recurring appointment takes place.  Occurrences are
+    numbered from 0, the date of the first appointment.
+    """
+    def nth(self, first: date, n: int) -> date:
+        """Date of occurrence n"""
+        raise NotImplementedError("Recurrence classes must implement 'nth'")
+
+    def first_index(self, first: date, day: date) -> int:
+        """Number of the first occurrence on or after day"""
+        raise NotImplementedError("Recurrence classes must implement 'first_index'")
+
+    def dates(self, first: date, since: date) -> Iterator[date]:
+        """Occurrence dates on or after since, in order, without
+        generating the occurrences before it.
+        """
+        n = self.first_index(first, since)
+        while True:
+            yield self.nth(first, n)
+            n += 1
+
+
+class Daily(Recurrence):
+    """Every day, or every 'every' days"""
+    def __init__(self, every: int = 1):
+        assert every >= 1, "Must recur at least one day apart"
+        self.every = every
+
+    def nth(self, first: date, n: int) -> date:
+        return first + n * self.every * ONE_DAY
+
+    def first_index(self, first: date, day: date) -> int:
+        days = (day - first).days
+        return max(0, -(-days // self.every))   # Ceiling division
+
+    def __repr__(self) -> str:
+        return f"Daily({self.every})"
+
+
+class Weekly(Daily):
+    """Same day every week, or every 'every' weeks"""
+    def __init__(self, every: int = 1):
+        super().__init__(7 * every)
+
+    def __repr__(self) -> str:
+        return f"Weekly({self.every // 7})"
+
+
+class EveryNWeekdays(Recurrence):
+    """Every n'th weekday (Monday through Friday), skipping
+    weekends; n=1 is every weekday.  The first appointment
+    must be on a weekday.
+    """
+    def __init__(self, n: int = 1):
+        assert n >= 1, "Must recur at least one weekday apart"
+        self.n = n
+
+    def nth(self, first: date, n: int) -> date:
+        assert first.weekday() < SATURDAY, f"{first} is not a weekday"
+        return add_weekdays(first, n * self.n)
+
+    def first_index(self, first: date, day: date) -> int:
+        if day <= first:
+            return 0
+        return -(-weekdays_between(first, day) // self.n)
+
+    def __repr__(self) -> str:
+        return f"EveryNWeekdays({self.n})"
+
+
+def add_weekdays(day: date, count: int) -> date:
+    """The weekday count weekdays after weekday 'day'"""
+    weeks, extra = divmod(count, 5)
+    day += weeks * 7 * ONE_DAY
+    while extra > 0:
+        day += ONE_DAY
+        if day.weekday() < SATURDAY:
+            extra -= 1
+    return day
+
+
+def weekdays_between(begin: date, end: date) -> int:
+    """Number of weekdays in [begin, end)"""
+    weeks, extra = divmod((end - begin).days, 7)
+    count = weeks * 5
+    day = begin + weeks * 7 * ONE_DAY
+    for _ in range(extra):
+        if day.weekday() < SATURDAY:
+            count += 1
+        day += ONE_DAY
+    return count
+
+
+class RecurringAppt:
+    """An appointment that repeats according to a Recurrence,
+    starting with appt and continuing through the date until
+    (forever if until is None).
+
+    Usage:
+    standup = RecurringAppt(Appt(datetime(2018, 3, 15, 9, 00),
+                                 datetime(2018, 3, 15, 9, 15), "Standup"),
+                            EveryNWeekdays(1))
+    for appt in standup.between(datetime(2018, 3, 16), datetime(2018, 3, 20)):
+        print(appt)
+
+    Expected output:
+    2018-03-16 09:00 09:15 | Standup
+    2018-03-19 09:00 09:15 | Standup
+    """
+    def __init__(self, appt: Appt, rule: Recurrence, until: Optional[date] = None):
+        self.appt = appt
+        self.rule = rule
+        self.until = until
+
+    def between(self, begin: datetime, end: datetime) -> Iterator[Appt]:
+        """The occurrences that overlap [begin, end), in order,
+        each built as it is needed.
+        """
+        first = self.appt.start.date()
+        length = self.appt.finish - self.appt.start
+        for day in self.rule.dates(first, begin.date()):
+            if day > end.date() or (self.until is not None and day > self.until):
+                return
+            start = self.appt.start + (day - first)
+            if start >= end:
+                return
+            if start + length > begin:
+                yield Appt(start, start + length, self.appt.desc)
+
+    def __repr__(self) -> str:
+        return f"RecurringAppt({repr(self.appt)}, {repr(self.rule)}, {repr(self.until)})"
+
+
+class AgendaView:
+    """An agenda of one-off appointments plus recurring series,
+    viewed through a window of time.  Occurrences of the series
+    exist only while a window is being examined.
+    """
+    def __init__(self, agenda: Optional[Agenda] = None):
+        self.agenda = agenda if agenda is not None else Agenda()
+        self.series: List[RecurringAppt] = []
+
+    def append(self, appt: Appt):
+        """Add a one-off appointment"""
+        self.agenda.append(appt)
+
+    def add_series(self, series: RecurringAppt):
+        self.series.append(series)
+
+    def between(self, begin: datetime, end: datetime) -> Iterator[Appt]:
+        """All appointments overlapping [begin, end), one-off and
+        recurring, in order of start time.
+        """
+        self.agenda.sort()
+        one_offs = (appt for appt in self.agenda.elements
+                    if appt.start < end and appt.finish > begin)
+        streams = [one_offs] + [series.between(begin, end) for series in self.series]
+        return heapq.merge(*streams, key=lambda appt: appt.start)
+
+    def window(self, begin: datetime, end: datetime) -> Agenda:
+        """An Agenda of the appointments overlapping [begin, end)"""
+        agenda = Agenda()
+        agenda.elements = list(self.between(begin, end))
+        return agenda
+
+    def conflicts(self, begin: datetime, end: datetime) -> Agenda:
+        """Conflicts among the appointments overlapping [begin, end)"""
+        conflict_agenda = Agenda()
+        conflict_agenda.elements = list(sweep_conflicts(self.between(begin, end)))
+        return conflict_agenda
@@ -0,0 +1,343 @@
+"""
+Tests for appt.py and the agendas built on it.
+
+Each way of finding conflicts, overlaps and free time is
+checked against the obvious O(n^2) comparison of every pair
+on random agendas spanning several days.
+"""
+import io
+import random
+import unittest
+from datetime import date, datetime, timedelta
+
+import agenda_columns
+import agenda_index
+import agenda_io
+import compact_appt
+import free_slots
+import recurrence
+from appt import Appt, Agenda, sweep_conflicts
+
+DAY = datetime(2018, 3, 12)   # A Monday
+DAYS = 4
+
+
+def random_appts(rng: random.Random, n: int, cls=Appt) -> list:
+    """n appointments with distinct descriptions, each within
+    one of DAYS days, on whole minutes
+    """
+    appts = []
+    for i in range(n):
+        start = DAY + timedelta(days=rng.randrange(DAYS),
+                                minutes=rng.randrange(6 * 60, 20 * 60, 5))
+        length = timedelta(minutes=rng.randrange(5, 180, 5))
+        appts.append(cls(start, start + length, f"A{i}"))
+    return appts
+
+
+def agenda_of(appts: list, kind=Agenda) -> Agenda:
+    agenda = kind()
+    for appt in appts:
+        agenda.append(appt)
+    return agenda
+
+
+def conflict_key(appt) -> tuple:
+    """A conflict, regardless of which of its pair came first"""
+    return appt.start, appt.finish, tuple(sorted(appt.desc.split(" and ")))
+
+
+def oracle_conflicts(appts: list) -> list:
+    """Every overlapping pair, by comparing every pair"""
+    return sorted(conflict_key(a.intersect(b))
+                  for i, a in enumerate(appts) for b in appts[i + 1:]
+                  if a.overlaps(b))
+
+
+def keys(conflicts) -> list:
+    return sorted(conflict_key(appt) for appt in conflicts)
+
+
+class TestAppt(unittest.TestCase):
+
+    def test_compare(self):
+        nap = Appt(datetime(2018, 3, 15, 13, 30), datetime(2018, 3, 15, 15, 30), "Nap")
+        coffee = Appt(datetime(2018, 3, 15, 15, 0), datetime(2018, 3, 15, 16, 0), "Coffee")
+        later = Appt(datetime(2018, 3, 15, 16, 0), datetime(2018, 3, 15, 17, 0), "Later")
+        self.assertTrue(nap.overlaps(coffee))
+        self.assertFalse(coffee.overlaps(later))   # Touching is not overlapping
+        self.assertTrue(coffee < later)
+        self.assertTrue(later > coffee)
+        self.assertEqual(str(nap.intersect(coffee)),
+                         "2018-03-15 15:00 15:30 | Nap and Coffee")
+
+
+class TestConflicts(unittest.TestCase):
+
+    def test_every_pair(self):
+        """Agenda.conflicts reports every overlapping pair once"""
+        for seed in range(10):
+            appts = random_appts(random.Random(seed), 60)
+            agenda = agenda_of(appts)
+            self.assertEqual(keys(agenda.conflicts().elements), oracle_conflicts(appts))
+
+    def test_sweep_order(self):
+        """Conflicts come out in order of the later start"""
+        appts = sorted(random_appts(random.Random(1), 80), key=lambda appt: appt.start)
+        starts = [conflict.start for conflict in sweep_conflicts(appts)]
+        self.assertEqual(starts, sorted(starts))
+
+    def test_workers(self):
+        """Per-day workers give the same conflicts in the same order"""
+        appts = random_appts(random.Random(2), 120)
+        alone = agenda_of(appts).conflicts()
+        pooled = agenda_of(appts).conflicts(workers=2)
+        self.assertEqual([str(appt) for appt in pooled.elements],
+                         [str(appt) for appt in alone.elements])
+
+    def test_no_conflicts(self):
+        agenda = agenda_of([Appt(DAY + timedelta(hours=h), DAY + timedelta(hours=h + 1), "x")
+                            for h in range(5)])
+        self.assertEqual(len(agenda.conflicts()), 0)
+        self.assertEqual(len(Agenda().conflicts()), 0)
+
+
+class TestCompactAppt(unittest.TestCase):
+
+    def test_same_as_appt(self):
+        rng = random.Random(8)
+        for _ in range(500):
+            periods = [(appt.start, appt.finish, appt.desc) for appt in random_appts(rng, 2)]
+            a, b = [Appt(*period) for period in periods]
+            ca, cb = [compact_appt.CompactAppt(*period) for period in periods]
+            self.assertEqual(str(ca), str(a))
+            self.assertEqual((ca < cb, ca > cb, ca == cb, ca.overlaps(cb)),
+                             (a < b, a > b, a == b, a.overlaps(b)))
+            if a.overlaps(b):
+                self.assertEqual(str(ca.intersect(cb)), str(a.intersect(b)))
+
+    def test_agenda_conflicts(self):
+        for seed in range(5):
+            appts = random_appts(random.Random(seed), 60, compact_appt.CompactAppt)
+            agenda = agenda_of(appts, compact_appt.CompactAgenda)
+            self.assertEqual(keys(agenda.conflicts().elements), oracle_conflicts(appts))
+            self.assertEqual(keys(agenda.conflicts(workers=2).elements),
+                             oracle_conflicts(appts))
+
+    def test_description_is_a_snapshot(self):
+        """Like Appt, an intersection keeps the descriptions
+        its appointments had when it was made
+        """
+        nap, coffee, call = [
+            compact_appt.CompactAppt(DAY + timedelta(minutes=start),
+                                     DAY + timedelta(minutes=finish), desc)
+            for start, finish, desc in [(0, 90, "Nap"), (60, 120, "Coffee"), (70, 80, "Call")]]
+        both = nap.intersect(coffee)
+        all_three = both.intersect(call)
+        nap.desc = "changed"
+        self.assertEqual(both.desc, "Nap and Coffee")
+        self.assertEqual(all_three.desc, "Nap and Coffee and Call")
+
+
+class TestIndexedAgenda(unittest.TestCase):
+
+    def check(self, agenda: agenda_index.IndexedAgenda, rng: random.Random):
+        appts = agenda.elements
+        for _ in range(20):
+            begin = DAY + timedelta(minutes=rng.randrange(DAYS * 24 * 60))
+            end = begin + timedelta(minutes=rng.randrange(1, 240))
+            found = agenda.overlapping(begin, end).elements
+            self.assertEqual(sorted(map(id, found)),
+                             sorted(id(appt) for appt in appts
+                                    if appt.start < end and appt.finish > begin))
+            self.assertEqual([appt.start for appt in found],
+                             sorted(appt.start for appt in found))
+            self.assertEqual(sorted(map(id, agenda.at(begin).elements)),
+                             sorted(id(appt) for appt in appts
+                                    if appt.start <= begin < appt.finish))
+
+    def test_queries(self):
+        rng = random.Random(3)
+        agenda = agenda_of(random_appts(rng, 200), agenda_index.IndexedAgenda)
+        self.check(agenda, rng)
+
+    def test_changes_between_queries(self):
+        """Appends and removes between queries, more than the
+        index absorbs before it is rebuilt
+        """
+        rng = random.Random(4)
+        agenda = agenda_of(random_appts(rng, 100), agenda_index.IndexedAgenda)
+        for appt in random_appts(rng, 100):
+            agenda.append(appt)
+            if rng.random() < 0.4:
+                agenda.remove(rng.choice(agenda.elements))
+            if rng.random() < 0.2:
+                self.check(agenda, rng)
+        self.check(agenda, rng)
+
+
+class TestLiveAgenda(unittest.TestCase):
+
+    def test_appends_and_removes(self):
+        rng = random.Random(5)
+        agenda = agenda_index.LiveAgenda()
+        for appt in random_appts(rng, 150):
+            agenda.append(appt)
+            if rng.random() < 0.3:
+                agenda.remove(rng.choice(agenda.elements))
+            if rng.random() < 0.1:
+                self.assertEqual(keys(agenda.conflicts().elements),
+                                 oracle_conflicts(agenda.elements))
+        starts = [appt.start for appt in agenda.elements]
+        self.assertEqual(starts, sorted(starts))
+        self.assertEqual(keys(agenda.conflicts().elements),
+                         oracle_conflicts(agenda.elements))
+
+    def test_remove_missing(self):
+        agenda = agenda_index.LiveAgenda()
+        with self.assertRaises(ValueError):
+            agenda.remove(Appt(DAY, DAY + timedelta(hours=1), "Missing"))
+
+
+class TestColumnAgenda(unittest.TestCase):
+
+    def test_conflict_pairs(self):
+        for seed in range(5):
+            appts = random_appts(random.Random(seed), 80)
+            columns = agenda_columns.ColumnAgenda.from_appts(appts)
+            earlier, later = columns.conflict_pairs()
+            pairs = sorted(tuple(sorted(pair)) for pair in zip(earlier.tolist(), later.tolist()))
+            expected = [(i, j) for i in range(len(appts)) for j in range(i + 1, len(appts))
+                        if appts[i].overlaps(appts[j])]
+            self.assertEqual(pairs, expected)
+            for i, j in zip(earlier, later):
+                self.assertLessEqual(appts[i].start, appts[j].start)
+            self.assertEqual(keys(columns.conflicts().to_agenda().elements),
+                             oracle_conflicts(appts))
+
+    def test_queries(self):
+        rng = random.Random(6)
+        appts = random_appts(rng, 100)
+        columns = agenda_columns.ColumnAgenda.from_appts(appts)
+        for _ in range(20):
+            begin = DAY + timedelta(minutes=rng.randrange(DAYS * 24 * 60))
+            end = begin + timedelta(minutes=rng.randrange(1, 240))
+            self.assertEqual(sorted(map(str, columns.overlapping(begin, end).to_agenda().elements)),
+                             sorted(str(appt) for appt in appts
+                                    if appt.start < end and appt.finish > begin))
+            self.assertEqual(sorted(map(str, columns.at(begin).to_agenda().elements)),
+                             sorted(str(appt) for appt in appts
+                                    if appt.start <= begin < appt.finish))
+
+
+def busy_minutes(agendas, begin: datetime, end: datetime) -> list:
+    """For each minute from begin to end, is anyone busy?"""
+    minutes = (end - begin) // timedelta(minutes=1)
+    busy = [False] * minutes
+    for agenda in agendas:
+        for appt in agenda.elements:
+            first = max(0, (appt.start - begin) // timedelta(minutes=1))
+            last = min(minutes, (appt.finish - begin) // timedelta(minutes=1))
+            for minute in range(first, last):
+                busy[minute] = True
+    return busy
+
+
+class TestFreeSlots(unittest.TestCase):
+
+    def agendas(self, seed: int) -> list:
+        rng = random.Random(seed)
+        return [agenda_of(random_appts(rng, 12)) for _ in range(3)]
+
+    def test_earliest_free(self):
+        for seed in range(5):
+            agendas = self.agendas(seed)
+            begin, end = DAY, DAY + timedelta(days=DAYS)
+            busy = busy_minutes(agendas, begin, end)
+            for length in (15, 60, 240, 600):
+                free = free_slots.earliest_free(agendas, timedelta(minutes=length),
+                                                after=begin, before=end)
+                expected = next((minute for minute in range(len(busy) - length + 1)
+                                 if not any(busy[minute:minute + length])), None)
+                if expected is None:
+                    self.assertIsNone(free)
+                else:
+                    self.assertEqual(free.start, begin + timedelta(minutes=expected))
+                    self.assertEqual(free.finish - free.start, timedelta(minutes=length))
+
+    def test_free_periods(self):
+        for seed in range(5):
+            agendas = self.agendas(seed)
+            begin, end = DAY + timedelta(hours=7), DAY + timedelta(days=DAYS - 1, hours=5)
+            busy = busy_minutes(agendas, begin, end)
+            expected = []
+            for minute, is_busy in enumerate(busy):
+                if is_busy:
+                    continue
+                if expected and expected[-1][1] == minute:
+                    expected[-1][1] = minute + 1
+                else:
+                    expected.append([minute, minute + 1])
+            periods = free_slots.free_periods(agendas, begin, end)
+            self.assertEqual([((appt.start - begin) // timedelta(minutes=1),
+                               (appt.finish - begin) // timedelta(minutes=1))
+                              for appt in periods],
+                             [tuple(period) for period in expected])
+
+
+class TestRecurrence(unittest.TestCase):
+
+    def test_first_index(self):
+        """The first occurrence on or after each day, compared
+        with counting occurrences one by one
+        """
+        rules = [recurrence.Daily(1), recurrence.Daily(3), recurrence.Weekly(1),
+                 recurrence.Weekly(2), recurrence.EveryNWeekdays(1),
+                 recurrence.EveryNWeekdays(3)]
+        for rule in rules:
+            for first in (date(2018, 3, 12), date(2018, 3, 16)):   # Monday, Friday
+                for offset in range(-3, 40):
+                    day = first + timedelta(days=offset)
+                    n = rule.first_index(first, day)
+                    self.assertGreaterEqual(rule.nth(first, n), day, f"{rule} {day}")
+                    if n > 0:
+                        self.assertLess(rule.nth(first, n - 1), day, f"{rule} {day}")
+
+    def test_between(self):
+        standup = recurrence.RecurringAppt(
+            Appt(datetime(2018, 3, 15, 9, 0), datetime(2018, 3, 15, 9, 15), "Standup"),
+            recurrence.EveryNWeekdays(1), until=date(2018, 3, 21))
+        days = [appt.start.day for appt in
+                standup.between(datetime(2018, 3, 10), datetime(2018, 3, 31))]
+        self.assertEqual(days, [15, 16, 19, 20, 21])
+
+
+class TestAgendaIO(unittest.TestCase):
+
+    def test_round_trip(self):
+        appts = random_appts(random.Random(7), 50)
+        appts.append(Appt(DAY, DAY + timedelta(minutes=30), "Pipe | in description"))
+        for appt in appts:
+            parsed = agenda_io.parse_appt(str(appt))
+            self.assertEqual(parsed, appt)
+            self.assertEqual(parsed.desc, appt.desc)
+        file = io.StringIO()
+        self.assertEqual(agenda_io.write_appts(file, appts), len(appts))
+        file.seek(0)
+        self.assertEqual([str(appt) for appt in agenda_io.read_appts(file)],
+                         [str(appt) for appt in appts])
+
+    def test_bad_line(self):
+        with self.assertRaises(ValueError):
+            list(agenda_io.read_appts(io.StringIO("2018-03-15 13:30 | No finish\n")))
+
+    def test_stream_conflicts(self):
+        appts = sorted(random_appts(random.Random(9), 60), key=lambda appt: appt.start)
+        self.assertEqual(keys(agenda_io.stream_conflicts(iter(appts))),
+                         oracle_conflicts(appts))
+        with self.assertRaises(ValueError):
+            list(agenda_io.stream_conflicts(reversed(appts)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,224 @@
+"""
+Computer players for 512.  A player looks at a model.Board
+and chooses the next move, by name ("left", "right", "up"
+or "down", the names of the Board methods).
+
+Searching works on the bitboard representation (bitboard.py),
+so looking ahead never copies Tile objects.  Two strategies:
+
+  - ExpectimaxPlayer looks a fixed number of moves ahead,
+    averaging over the tiles the game might place after each
+    move.  Positions already evaluated are remembered in a
+    transposition table.
+  - RolloutPlayer plays many random games from the position
+    after each possible move (optionally in a process pool)
+    and picks the move whose games lasted best.
+
+Game play follows game_manager: each turn a tile is placed,
+then a move is made, and the game is over when there is no
+empty cell for the next tile.
+"""
+
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Union
+import argparse
+
+import bitboard
+import game_manager
+import model
+
+# Probabilities of the tiles placed by place_tile
+SPAWNS = [(1, 0.9), (2, 0.1)]   # (exponent, probability)
+# Heuristic value of a board on which the game is over
+LOST = -1_000_000.0
+
+
+def _row_heuristic(row: int) -> float:
+    """Value of one row: empty cells are worth most, then pairs
+    that could merge, and rows whose tiles rise or fall steadily
+    (so that merges can cascade) over rows that zigzag.
+    """
+    exps = [(row >> (4 * col)) & 0xF for col in range(4)]
+    empty = exps.count(0)
+    merges = sum(1 for a, b in zip(exps, exps[1:]) if a and a == b)
+    rising = sum(b - a for a, b in zip(exps, exps[1:]) if b > a)
+    falling = sum(a - b for a, b in zip(exps, exps[1:]) if a > b)
+    return 10.0 * empty + 5.0 * merges - 1.0 * min(rising, falling)
+
+
+ROW_HEURISTIC = [_row_heuristic(row) for row in range(1 << 16)]
+
+
+def heuristic(board: int) -> float:
+    """Static value of a board, from its rows and columns"""
+    total = 0.0
+    for rows in (board, bitboard.transpose(board)):
+        for shift in (0, 16, 32, 48):
+            total += ROW_HEURISTIC[(rows >> shift) & bitboard.ROW_MASK]
+    return total
+
+
+def useful_moves(board: int) -> List[Tuple[str, int]]:
+    """(name, resulting board) for each move that changes the board"""
+    result = []
+    for name, move in bitboard.MOVES.items():
+        after = move(board)
+        if after != board:
+            result.append((name, after))
+    return result
+
+
+def as_bitboard(board: Union[model.Board, int]) -> int:
+    if isinstance(board, int):
+        return board
+    assert board.rows == board.cols == bitboard.GRID_SIZE, \
+        "Computer players only play on 4x4 boards"
+    return bitboard.from_list(board.to_list())
+
+
+class ExpectimaxPlayer:
+    """Chooses the move with the best expected heuristic value
+    'depth' moves ahead.
+    """
+
+    def __init__(self, depth: int = 2):
+        assert depth >= 1
+        self.depth = depth
+        self.evaluated = 0   # Positions visited, for tuning depth
+        self._table: Dict[Tuple[int, int], float] = {}
+
+    def choose(self, board: Union[model.Board, int]) -> str:
+        """Name of the best move on this board"""
+        state = as_bitboard(board)
+        self._table.clear()
+        best_name, best_value = "left", None
+        for name, after in useful_moves(state):
+            value = self._chance(after, self.depth - 1)
+            if best_value is None or value > best_value:
+                best_name, best_value = name, value
+        return best_name
+
+    def _chance(self, board: int, depth: int) -> float:
+        """Expected value after the game places its next tile"""
+        key = (board, depth)
+        if key in self._table:
+            return self._table[key]
+        self.evaluated += 1
+        empties = bitboard.empty_cells(board)
+        if not empties:
+            value = LOST
+        elif depth == 0:
+            value = heuristic(board)
+        else:
+            total = 0.0
+            for cell in empties:
+                for exp, prob in SPAWNS:
+                    total += prob * self._max(board | exp << (4 * cell), depth)
+            value = total / len(empties)
+        self._table[key] = value
+        return value
+
+    def _max(self, board: int, depth: int) -> float:
+        """Value of the best move the player can make"""
+        moves = useful_moves(board)
+        if not moves:
+            # Every move is ineffective, so any of them will do
+            return self._chance(board, depth - 1)
+        return max(self._chance(after, depth - 1) for _, after in moves)
+
+
+def rollout(board: int, seed: int, max_turns: int = 10_000) -> int:
+    """Number of turns a game lasts from this board (just after
+    a move) when both moves and placed tiles are random.
+    """
+    rng = random.Random(seed)
+    moves = list(bitboard.MOVES.values())
+    turns = 0
+    while turns < max_turns and bitboard.empty_cells(board):
+        board = bitboard.place_tile(board, rng=rng)
+        board = rng.choice(moves)(board)
+        turns += 1
+    return turns
+
+
+def _rollouts(board: int, seeds: List[int]) -> int:
+    """Total turns over several rollouts; one task for a worker"""
+    return sum(rollout(board, seed) for seed in seeds)
+
+
+class RolloutPlayer:
+    """Chooses the move after which random games last longest,
+    on average over 'rollouts' games per move.  With workers > 1,
+    rollouts run in a process pool; call close() when done.
+    """
+
+    def __init__(self, rollouts: int = 100, workers: int = 1, seed: int = None):
+        self.rollouts = rollouts
+        self.rng = random.Random(seed)
+        self.evaluated = 0
+        self._pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        self._chunks = max(1, workers)
+
+    def choose(self, board: Union[model.Board, int]) -> str:
+        """Name of the best move on this board"""
+        state = as_bitboard(board)
+        moves = useful_moves(state)
+        if not moves:
+            return "left"
+        tasks = []
+        for _, after in moves:
+            seeds = [self.rng.getrandbits(64) for _ in range(self.rollouts)]
+            for chunk in range(self._chunks):
+                tasks.append((after, seeds[chunk::self._chunks]))
+        if self._pool is None:
+            totals = [_rollouts(after, seeds) for after, seeds in tasks]
+        else:
+            totals = list(self._pool.map(_rollouts, *zip(*tasks)))
+        self.evaluated += len(moves) * self.rollouts
+        by_move = [sum(totals[i:i + self._chunks])
+                   for i in range(0, len(totals), self._chunks)]
+        best = max(range(len(moves)), key=lambda i: by_move[i])
+        return moves[best][0]
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+def play(player, seed: int = None) -> model.Board:
+    """Play one game with no view attached"""
+    return game_manager.play_headless(player.choose, random.Random(seed))
+
+
+def cli() -> object:
+    """Command line interface returns an object with
+    an instance variable for each command line argument.
+    """
+    parser = argparse.ArgumentParser(description="Computer player for 512")
+    parser.add_argument("--strategy", choices=["expectimax", "rollout"],
+                        default="expectimax")
+    parser.add_argument("--depth", type=int, default=2,
+                        help="Expectimax search depth, in moves")
+    parser.add_argument("--rollouts", type=int, default=100,
+                        help="Random games per move for the rollout strategy")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes for rollouts")
+    return parser.parse_args()
+
+
+def main():
+    args = cli()
+    if args.strategy == "expectimax":
+        player = ExpectimaxPlayer(args.depth)
+    else:
+        player = RolloutPlayer(args.rollouts, args.workers)
+    board = play(player)
+    if isinstance(player, RolloutPlayer):
+        player.close()
+    print(f"Score: {board.score()} ({player.evaluated} positions evaluated)")
+
+
+if __name__ == "__main__":
+    main()
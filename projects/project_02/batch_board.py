@@ -0,0 +1,148 @@
+"""
+Many 4x4 games of 512 stepped at once with NumPy, e.g., as a
+batched environment for reinforcement learning.
+
+All boards are held in one (N, 4, 4) array of tile exponents
+(a tile of value 2**e is stored as e, an empty cell as 0).
+A move encodes each row as a 16-bit index and looks up its
+result in the row tables of bitboard.py, so the rules are
+exactly those of model.Board.slide (with the same limit of
+exponent 15 as bitboard.py).
+"""
+
+from typing import List, Optional
+
+import numpy as np
+
+import bitboard
+import game_manager
+
+MOVES = game_manager.MOVES   # Action numbers are indexes here
+ROW_LEFT = np.array(bitboard.ROW_LEFT, dtype=np.uint16)
+ROW_RIGHT = np.array(bitboard.ROW_RIGHT, dtype=np.uint16)
+SHIFTS = np.array([0, 4, 8, 12], dtype=np.uint16)   # Nibble of each column
+# For each move: the row table, and whether it slides columns instead of rows
+SLIDES = {"left": (ROW_LEFT, False), "right": (ROW_RIGHT, False),
+          "up": (ROW_LEFT, True), "down": (ROW_RIGHT, True)}
+
+
+def _slide(rows: np.ndarray, table: np.ndarray) -> np.ndarray:
+    """Apply a row table to an (..., 4) array of exponents"""
+    codes = (rows.astype(np.uint16) << SHIFTS).sum(axis=-1, dtype=np.uint16)
+    moved = table[codes]
+    return ((moved[..., np.newaxis] >> SHIFTS) & 0xF).astype(np.uint8)
+
+
+class BatchBoard:
+    """N boards of 512, each 4x4.
+
+    Usage, with the turn order of game_manager (a game is
+    over when there is no empty cell for the next tile):
+        boards = BatchBoard(1000, seed=42)
+        rng = np.random.default_rng()
+        boards.place_tile()
+        playing = boards.has_empty()
+        while playing.any():
+            boards.place_tile(where=playing)
+            boards.move(rng.integers(0, 4, size=1000), where=playing)
+            playing &= boards.has_empty()
+        print(boards.score())
+    """
+
+    def __init__(self, n: int, seed: Optional[int] = None):
+        self.exponents = np.zeros((n, bitboard.GRID_SIZE, bitboard.GRID_SIZE),
+                                  dtype=np.uint8)
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        return len(self.exponents)
+
+    def from_lists(self, boards: List[List[List[int]]]):
+        """Set each board from tile values as in model.Board.to_list"""
+        values = np.asarray(boards, dtype=np.int64)
+        assert values.shape == self.exponents.shape
+        exps = np.zeros(values.shape, dtype=np.int64)
+        occupied = values > 0
+        exps[occupied] = np.log2(values[occupied]).round().astype(np.int64)
+        if np.any((1 << exps[occupied]) != values[occupied]) or \
+                np.any(exps > bitboard.MAX_EXPONENT):
+            raise ValueError("Tile values must be powers of 2 from 2 to 32768")
+        self.exponents[...] = exps
+
+    def to_lists(self) -> List[List[List[int]]]:
+        """Tile values of each board, as in model.Board.to_list"""
+        return self.values().tolist()
+
+    def values(self) -> np.ndarray:
+        """(N, 4, 4) array of tile values, 0 for empty"""
+        exps = self.exponents.astype(np.int64)
+        return np.where(exps > 0, 1 << exps, 0)
+
+    def score(self) -> np.ndarray:
+        """Sum of tile values of each board, as model.Board.score"""
+        return self.values().sum(axis=(1, 2))
+
+    def has_empty(self) -> np.ndarray:
+        """Which boards have at least one empty cell"""
+        return (self.exponents == 0).any(axis=(1, 2))
+
+    def left(self):
+        self.exponents = _slide(self.exponents, ROW_LEFT)
+
+    def right(self):
+        self.exponents = _slide(self.exponents, ROW_RIGHT)
+
+    def up(self):
+        columns = self.exponents.transpose(0, 2, 1)
+        self.exponents = _slide(columns, ROW_LEFT).transpose(0, 2, 1).copy()
+
+    def down(self):
+        columns = self.exponents.transpose(0, 2, 1)
+        self.exponents = _slide(columns, ROW_RIGHT).transpose(0, 2, 1).copy()
+
+    def move(self, actions: np.ndarray, where: Optional[np.ndarray] = None):
+        """A different move for each board: actions[i] is the
+        index in MOVES of the move for board i.  If where is
+        given, only boards i where where[i] is True move.
+        """
+        actions = np.asarray(actions)
+        assert actions.shape == (len(self),)
+        moving = np.ones(len(self), dtype=bool) if where is None \
+            else np.asarray(where, dtype=bool)
+        # Each board is slid once, by the move it chose
+        for action, name in enumerate(MOVES):
+            boards = np.flatnonzero(moving & (actions == action))
+            if len(boards) == 0:
+                continue
+            table, by_col = SLIDES[name]
+            lines = self.exponents[boards]
+            if by_col:
+                self.exponents[boards] = _slide(lines.transpose(0, 2, 1),
+                                                table).transpose(0, 2, 1)
+            else:
+                self.exponents[boards] = _slide(lines, table)
+
+    def place_tile(self, value: Optional[int] = None,
+                   where: Optional[np.ndarray] = None):
+        """On each board that has an empty cell (and where[i] is
+        True, if where is given), place a tile on one of its empty
+        cells chosen uniformly at random.  As in
+        model.Board.place_tile, the tile is value if given, else
+        a 2, or with 0.1 probability a 4.
+        """
+        n = len(self)
+        flat = self.exponents.reshape(n, -1)
+        empty = flat == 0
+        # The empty cell with the highest random key is chosen
+        keys = np.where(empty, self.rng.random(flat.shape), -1.0)
+        cells = keys.argmax(axis=1)
+        if value is None:
+            exps = np.where(self.rng.random(n) > 0.1, 1, 2)
+        else:
+            exps = np.full(n, int(value).bit_length() - 1)
+        placing = empty.any(axis=1)
+        if where is not None:
+            placing &= np.asarray(where)
+        boards = np.flatnonzero(placing)
+        flat[boards, cells[boards]] = exps[boards]
+        self.exponents = flat.reshape(self.exponents.shape)
@@ -0,0 +1,176 @@
+"""
+A headless engine for 4x4 games of 512, for running
+very many simulated games (e.g., to train or test a
+computer player).  It has the same rules as model.Board
+but none of its objects: a whole board is one integer.
+
+Each of the 16 cells is 4 bits holding the exponent of
+its tile (a tile of value 2**e is stored as e, an empty
+cell as 0), so a board is a 64-bit integer.  Row r is bits
+16*r through 16*r + 15, and column c of a row is its
+c'th 4-bit "nibble" counting from the low end.  Moves are
+table lookups, one per row; up and down work on the
+transposed board, whose rows are the original columns.
+
+Exponents stop at 15 (a tile of 32768).  Two such tiles
+do not merge here, although they would in model.Board.
+"""
+
+import random
+from typing import Callable, Dict, List, Optional
+
+GRID_SIZE = 4
+MAX_EXPONENT = 15
+ROW_MASK = 0xFFFF
+
+
+def _slide_row(exponents: List[int]) -> List[int]:
+    """Exponents of one row after a move toward index 0,
+    with the rules of model.Board.slide: the tile nearest
+    the edge moves first, and a tile that absorbs another
+    stops there but may itself be absorbed by the next.
+    """
+    packed = []
+    for exp in exponents:
+        if exp == 0:
+            continue
+        if packed and packed[-1] == exp and exp < MAX_EXPONENT:
+            packed[-1] = exp + 1
+        else:
+            packed.append(exp)
+    return packed + [0] * (len(exponents) - len(packed))
+
+
+def _row_exponents(row: int) -> List[int]:
+    return [(row >> (4 * col)) & 0xF for col in range(GRID_SIZE)]
+
+
+def _row_code(exponents: List[int]) -> int:
+    code = 0
+    for col, exp in enumerate(exponents):
+        code |= exp << (4 * col)
+    return code
+
+
+def _build_tables():
+    left, right, score = [], [], []
+    for row in range(1 << 16):
+        exponents = _row_exponents(row)
+        left.append(_row_code(_slide_row(exponents)))
+        right.append(_row_code(_slide_row(exponents[::-1])[::-1]))
+        score.append(sum(1 << exp for exp in exponents if exp))
+    return left, right, score
+
+
+# Indexed by a 16-bit row: the row after moving left or right,
+# and the total value of its tiles
+ROW_LEFT, ROW_RIGHT, ROW_SCORE = _build_tables()
+
+
+def from_list(values: List[List[int]]) -> int:
+    """Board from tile values as in model.Board.to_list,
+    where 0 is an empty cell.
+    """
+    board = 0
+    for row_i, row in enumerate(values):
+        for col_i, value in enumerate(row):
+            if value == 0:
+                continue
+            exp = value.bit_length() - 1
+            if value != 1 << exp or not 1 <= exp <= MAX_EXPONENT:
+                raise ValueError(f"Cannot represent tile value {value}")
+            board |= exp << (4 * (GRID_SIZE * row_i + col_i))
+    return board
+
+
+def to_list(board: int) -> List[List[int]]:
+    """Tile values as in model.Board.to_list"""
+    result = []
+    for row_i in range(GRID_SIZE):
+        row = (board >> (16 * row_i)) & ROW_MASK
+        result.append([1 << exp if exp else 0 for exp in _row_exponents(row)])
+    return result
+
+
+def transpose(board: int) -> int:
+    """Swap rows and columns"""
+    a1 = board & 0xF0F00F0FF0F00F0F
+    a2 = board & 0x0000F0F00000F0F0
+    a3 = board & 0x0F0F00000F0F0000
+    a = a1 | (a2 << 12) | (a3 >> 12)
+    b1 = a & 0xFF00FF0000FF00FF
+    b2 = a & 0x00FF00FF00000000
+    b3 = a & 0x00000000FF00FF00
+    return b1 | (b2 >> 24) | (b3 << 24)
+
+
+def _move_rows(board: int, table: List[int]) -> int:
+    return (table[board & ROW_MASK]
+            | table[(board >> 16) & ROW_MASK] << 16
+            | table[(board >> 32) & ROW_MASK] << 32
+            | table[board >> 48] << 48)
+
+
+def left(board: int) -> int:
+    return _move_rows(board, ROW_LEFT)
+
+
+def right(board: int) -> int:
+    return _move_rows(board, ROW_RIGHT)
+
+
+def up(board: int) -> int:
+    return transpose(_move_rows(transpose(board), ROW_LEFT))
+
+
+def down(board: int) -> int:
+    return transpose(_move_rows(transpose(board), ROW_RIGHT))
+
+
+# Same names as the move methods of model.Board
+MOVES: Dict[str, Callable[[int], int]] = {
+    "left": left, "right": right, "up": up, "down": down}
+
+
+def legal_moves(board: int) -> List[str]:
+    """Names of the moves that would change the board.  A row
+    can move iff its table entry differs from it, so this is
+    one lookup per row and direction.
+    """
+    moves = []
+    columns = transpose(board)
+    for name, table, rows in (("left", ROW_LEFT, board),
+                              ("right", ROW_RIGHT, board),
+                              ("up", ROW_LEFT, columns),
+                              ("down", ROW_RIGHT, columns)):
+        for shift in (0, 16, 32, 48):
+            row = (rows >> shift) & ROW_MASK
+            if table[row] != row:
+                moves.append(name)
+                break
+    return moves
+
+
+def score(board: int) -> int:
+    """Sum of tile values, as model.Board.score"""
+    return (ROW_SCORE[board & ROW_MASK] + ROW_SCORE[(board >> 16) & ROW_MASK]
+            + ROW_SCORE[(board >> 32) & ROW_MASK] + ROW_SCORE[board >> 48])
+
+
+def empty_cells(board: int) -> List[int]:
+    """Cell numbers (4 * row + col) of the empty cells"""
+    return [cell for cell in range(GRID_SIZE * GRID_SIZE)
+            if not (board >> (4 * cell)) & 0xF]
+
+
+def place_tile(board: int, value: Optional[int] = None, rng=random) -> int:
+    """Place a tile on a randomly chosen empty cell, with
+    the probabilities of model.Board.place_tile: a 2 unless
+    value is given, or with 0.1 probability a 4.
+    """
+    empties = empty_cells(board)
+    assert len(empties) > 0
+    cell = rng.choice(empties)
+    if value is None:
+        value = 2 if rng.random() > 0.1 else 4
+    return board | (value.bit_length() - 1) << (4 * cell)
@@ -12,7 +12,11 @@ The 'model' component will inherit from the
 GameListener class and generate EventKind events.
 """
 
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
 from enum import Enum
+from typing import Callable, Dict, List, Optional, Tuple
 
 class EventKind(Enum):
     """All the kinds of events that we may notify listeners of"""
@@ -43,6 +47,172 @@ class GameListener(object):
 # -------------------------------------------
 
 
+class Frame(object):
+    """Events held back while a frame is open (e.g., during one
+    move), to be delivered together when it closes.  Events about
+    the same tile to the same listener are coalesced: an event
+    carries the tile itself, whose state is already final, so
+    only the last one matters, except that tile_created is kept
+    so the listener still learns of the tile.  After delivery,
+    the redraw callbacks registered with after_frame run once
+    each, so a view can apply the whole diff in one redraw.
+    """
+    def __init__(self):
+        self._events: Dict[Tuple[int, int], Tuple[GameListener, GameEvent]] = {}
+        self._redraws: List[Callable[[], None]] = []
+
+    def hold(self, listener: GameListener, event: GameEvent):
+        key = (id(listener), id(event.tile))
+        held = self._events.get(key)
+        if held is not None and held[1].kind == EventKind.tile_created \
+                and event.kind == EventKind.tile_updated:
+            return
+        self._events[key] = (listener, event)
+
+    def after(self, redraw: Callable[[], None]):
+        if redraw not in self._redraws:
+            self._redraws.append(redraw)
+
+    def deliver(self):
+        for listener, event in self._events.values():
+            _notify(listener, event)
+        for redraw in self._redraws:
+            if _profile is None:
+                redraw()
+            else:
+                start = time.perf_counter()
+                redraw()
+                _profile.listened(redraw.__qualname__, time.perf_counter() - start)
+
+
+class EventProfile(object):
+    """Counts of events by EventKind and time spent in listeners,
+    by listener class (or redraw callback), overall and for each
+    move measured with profile_move.  The time of a move not spent
+    in listeners is model logic (and whatever else the caller did).
+    """
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self.listener_seconds: Dict[str, float] = defaultdict(float)
+        self.moves: List[dict] = []
+        self._move_counts: Counter = Counter()
+        self._move_listener_seconds = 0.0
+
+    def emitted(self, kind: EventKind):
+        self.counts[kind] += 1
+        self._move_counts[kind] += 1
+
+    def listened(self, name: str, seconds: float):
+        self.listener_seconds[name] += seconds
+        self._move_listener_seconds += seconds
+
+    @contextmanager
+    def move(self, name: str):
+        """Record a summary of the block as one move"""
+        self._move_counts = Counter()
+        self._move_listener_seconds = 0.0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self.moves.append({"move": name,
+                               "seconds": seconds,
+                               "listener_seconds": self._move_listener_seconds,
+                               "events": {kind.name: n for kind, n in self._move_counts.items()}})
+
+    def report(self) -> str:
+        """Per-move summary, then totals"""
+        lines = []
+        for i, move in enumerate(self.moves):
+            events = ", ".join(f"{kind} {n}" for kind, n in move["events"].items())
+            lines.append(f"{i:4d} {move['move']:>8}: {1000 * move['seconds']:8.2f} ms, "
+                         f"listeners {1000 * move['listener_seconds']:8.2f} ms ({events})")
+        lines.append("Events: " + ", ".join(f"{kind.name} {n}" for kind, n in self.counts.items()))
+        for name, seconds in sorted(self.listener_seconds.items(), key=lambda item: -item[1]):
+            lines.append(f"{name:>24}: {1000 * seconds:10.2f} ms")
+        return "\n".join(lines)
+
+
+# The open frame, if any; frames do not nest (an inner
+# frame just joins the outer one)
+_frame: Optional[Frame] = None
+_delivering: Optional[Frame] = None
+# Profiling is off (None) unless started with start_profile
+_profile: Optional[EventProfile] = None
+
+
+def start_profile() -> EventProfile:
+    """Start counting events and timing listeners"""
+    global _profile
+    _profile = EventProfile()
+    return _profile
+
+
+def stop_profile() -> Optional[EventProfile]:
+    """Stop profiling; returns the profile, if there was one"""
+    global _profile
+    profile, _profile = _profile, None
+    return profile
+
+
+@contextmanager
+def profile_move(name: str):
+    """Summarize the block as one move in the profile, e.g.,
+        with game_element.profile_move("left"):
+            grid.left()
+    Does nothing if profiling is off.
+    """
+    if _profile is None:
+        yield
+    else:
+        with _profile.move(name):
+            yield
+
+
+def _notify(listener: GameListener, event: GameEvent):
+    if _profile is None:
+        listener.notify(event)
+        return
+    start = time.perf_counter()
+    listener.notify(event)
+    _profile.listened(type(listener).__name__, time.perf_counter() - start)
+
+
+@contextmanager
+def frame():
+    """Hold notifications from all game elements until the
+    end of the 'with frame():' block, then deliver them
+    coalesced, e.g.:
+        with game_element.frame():
+            grid.left()
+    """
+    global _frame, _delivering
+    if _frame is not None:
+        yield
+        return
+    _frame = Frame()
+    try:
+        yield
+    finally:
+        held, _frame = _frame, None
+        _delivering = held
+        try:
+            held.deliver()
+        finally:
+            _delivering = None
+
+
+def after_frame(redraw: Callable[[], None]):
+    """For listeners: run redraw once after all the events of
+    the frame being delivered, or right away if there is none.
+    """
+    if _delivering is not None:
+        _delivering.after(redraw)
+    else:
+        redraw()
+
+
 class GameElement(object):
     """Base class for game elements, especially to support
     depiction through Model-View-Controller.
@@ -63,7 +233,17 @@ class GameElement(object):
         the view component decide how to adjust the graphical view.
         When additional information must be packaged with an event,
         it goes in the optional 'data' parameter.
+        Within a frame (see 'frame'), events are held and
+        delivered when the frame closes.  If profiling (see
+        start_profile), the event is counted and each listener
+        timed.
         """
+        if _profile is not None:
+            _profile.emitted(event.kind)
+        if _frame is not None:
+            for listener in self._listeners:
+                _frame.hold(listener, event)
+            return
         for listener in self._listeners:
-            listener.notify(event)
+            _notify(listener, event)
 
@@ -1,15 +1,37 @@
 """
 Overall control for 2048 clone 512.  Coordinates
 model and view and implements controller
-functionality by interpreting keyboard input
+functionality by interpreting keyboard input.
+
+Can also run many games headless (no view, no keyboard)
+with a scripted or random player, e.g., for balancing
+experiments:
+    python game_manager.py --games 1000 --policy random --seed 42
 """
+import game_element
 import model
-import view
-import keypress
 import sys
+import argparse
+import itertools
+import random
+import statistics
+from typing import Callable, Dict, List, Optional, Tuple
+
+# A policy chooses the next move for a board, by the
+# name of the Board method that makes it
+Policy = Callable[[model.Board], str]
+MOVES = ["left", "right", "up", "down"]
+
 
+def main(profile: bool = False):
+    """Interactive game.  If profile, print a summary of event
+    traffic and listener time for each move at the end.
+    """
+    # The view and keypress modules open a Tk window when
+    # imported, so they are imported only for interactive play
+    import view
+    import keypress
 
-def main():
     # Set up model component
     grid = model.Board()
     # Set up view component
@@ -19,7 +41,10 @@ def main():
     # Handle control component responsibility here
     commands = keypress.Command(game_view)
 
-    # FIXME: We will change this to 
+    if profile:
+        game_element.start_profile()
+
+    # FIXME: We will change this to
     #  grid.place_tile(value=2) after
     #  creating the keyword argument in model.py
     grid.place_tile()
@@ -29,23 +54,124 @@ def main():
     while grid.has_empty():
         grid.place_tile()
         cmd = commands.next()
-        if cmd == keypress.LEFT:
-            grid.left()
-        elif cmd == keypress.RIGHT:
-            grid.right()
-        elif cmd == keypress.UP:
-            grid.up()
-        elif cmd == keypress.DOWN:
-            grid.down()
-        elif cmd == keypress.CLOSE:
-            # Ended game by closing window
-            print(f"Your score: {grid.score()}")
-            sys.exit(0)
-        else: 
-            assert cmd == keypress.UNMAPPED
+        # All the tile events of a move are drawn in one redraw
+        with game_element.profile_move(cmd), game_element.frame():
+            if cmd == keypress.LEFT:
+                grid.left()
+            elif cmd == keypress.RIGHT:
+                grid.right()
+            elif cmd == keypress.UP:
+                grid.up()
+            elif cmd == keypress.DOWN:
+                grid.down()
+            elif cmd == keypress.CLOSE:
+                # Ended game by closing window
+                print(f"Your score: {grid.score()}")
+                print_profile()
+                sys.exit(0)
+            else:
+                assert cmd == keypress.UNMAPPED
 
     game_view.lose(grid.score())
+    print_profile()
+
+
+def print_profile():
+    """Print the event profile, if profiling"""
+    profile = game_element.stop_profile()
+    if profile is not None:
+        print(profile.report())
+
+
+def random_policy(rng: random.Random) -> Policy:
+    """Each move chosen at random"""
+    return lambda board: rng.choice(MOVES)
+
+
+def scripted_policy(script: str) -> Policy:
+    """Moves taken in turn from script, repeating, where
+    each letter of script is l, r, u or d.
+    """
+    by_letter = {move[0]: move for move in MOVES}
+    moves = itertools.cycle([by_letter[letter] for letter in script.lower()])
+    return lambda board: next(moves)
+
+
+def play_headless(policy: Policy, rng: random.Random,
+                  rows: int = model.GRID_SIZE, cols: int = model.GRID_SIZE,
+                  turns: Optional[List[Tuple[int, Optional[str]]]] = None
+                  ) -> model.Board:
+    """One game with the turn order of main, but no view.
+    With no listeners, the model builds no events.
+    If turns is given, (value of placed tile, move) is
+    appended to it for each turn; the first turn has no move.
+    """
+    grid = model.Board(rows, cols, rng=rng)
+    tile = grid.place_tile()
+    if turns is not None:
+        turns.append((tile.value, None))
+    while grid.has_empty():
+        value = grid.place_tile().value
+        move = policy(grid)
+        getattr(grid, move)()
+        if turns is not None:
+            turns.append((value, move))
+    return grid
+
+
+def simulate(games: int, policy: str = "random", seed: int = None) -> List[int]:
+    """Scores of 'games' headless games.  policy is "random"
+    or a script for scripted_policy.  Game i uses seed + i,
+    so a batch can be re-run exactly.
+    """
+    if seed is None:
+        seed = random.randrange(sys.maxsize)
+    scores = []
+    for game in range(games):
+        rng = random.Random(seed + game)
+        if policy == "random":
+            chooser = random_policy(rng)
+        else:
+            chooser = scripted_policy(policy)
+        scores.append(play_headless(chooser, rng).score())
+    return scores
+
+
+def summarize(scores: List[int]) -> Dict[str, float]:
+    """Distribution of scores"""
+    # Inclusive, so the deciles of a small batch stay within its range
+    deciles = (statistics.quantiles(scores, n=10, method="inclusive")
+               if len(scores) > 1 else scores * 9)
+    return {"games": len(scores),
+            "mean": statistics.mean(scores),
+            "stdev": statistics.stdev(scores) if len(scores) > 1 else 0.0,
+            "min": min(scores),
+            "p10": deciles[0],
+            "median": statistics.median(scores),
+            "p90": deciles[-1],
+            "max": max(scores)}
+
+
+def cli() -> object:
+    """Command line interface returns an object with
+    an instance variable for each command line argument.
+    """
+    parser = argparse.ArgumentParser(description="512, a game like 2048")
+    parser.add_argument("--games", type=int, default=0,
+                        help="Play this many games headless instead of interactively")
+    parser.add_argument("--policy", default="random",
+                        help="'random', or a script of moves like 'lrud'")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--profile", action="store_true",
+                        help="Print event counts and listener times for each move")
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    main()
+    args = cli()
+    if args.games:
+        summary = summarize(simulate(args.games, args.policy, args.seed))
+        for key, value in summary.items():
+            print(f"{key:>6}: {value:g}")
+    else:
+        main(args.profile)
@@ -54,50 +54,96 @@ class Tile(GameElement):
     def move_to(self, new_pos: Vec):
         self.row = new_pos.x_dist
         self.col = new_pos.y_dist
-        self.notify_all(GameEvent(EventKind.tile_updated, self))
+        if self._listeners:
+            self.notify_all(GameEvent(EventKind.tile_updated, self))
 
     def merge(self, other: "Tile"):
         # This tile incorporates the value of the other tile
         self.value = self.value + other.value
-        self.notify_all(GameEvent(EventKind.tile_updated, self))
+        # Events are built only if someone is listening, so
+        # headless games (e.g., simulations) don't pay for them
+        if self._listeners:
+            self.notify_all(GameEvent(EventKind.tile_updated, self))
         # The other tile has been absorbed.  Resistance was futile.
-        other.notify_all(GameEvent(EventKind.tile_removed, other))
+        if other._listeners:
+            other.notify_all(GameEvent(EventKind.tile_removed, other))
+
+class CellSet():
+    """A set of (row, col) cells with O(1) add, discard,
+    membership, and uniform random choice.  Cells are kept
+    in a list (for choice) with each cell's index in a dict
+    (so a cell can be removed by swapping in the last one).
+    """
+    def __init__(self):
+        self._cells: List[Tuple[int, int]] = []
+        self._index = {}
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def __contains__(self, cell: Tuple[int, int]) -> bool:
+        return cell in self._index
+
+    def __iter__(self):
+        return iter(self._cells)
+
+    def add(self, cell: Tuple[int, int]):
+        if cell not in self._index:
+            self._index[cell] = len(self._cells)
+            self._cells.append(cell)
+
+    def discard(self, cell: Tuple[int, int]):
+        pos = self._index.pop(cell, None)
+        if pos is None:
+            return
+        last = self._cells.pop()
+        if pos < len(self._cells):
+            self._cells[pos] = last
+            self._index[last] = pos
+
+    def choice(self, rng) -> Tuple[int, int]:
+        return rng.choice(self._cells)
 
 class Board(GameElement):
     """The game grid.  Inherits 'add_listener' and 'notify_all'
     methods from game_element.GameElement so that the game
     can be displayed graphically.
+
+    The board keeps its score and its set of empty cells up
+    to date as tiles are placed and moved, so score, has_empty
+    and place_tile take constant time.  Tiles should therefore
+    be changed through the board (board[pos] = tile, from_list,
+    place_tile and the moves), not by writing to self.tiles.
     """
 
-    def __init__(self, rows=GRID_SIZE, cols=GRID_SIZE):
+    def __init__(self, rows=GRID_SIZE, cols=GRID_SIZE, rng=random):
+        """rng is the source of randomness for placing tiles,
+        e.g., a random.Random with a known seed to replay a game.
+        """
         super().__init__()
+        self.rng = rng
         self.rows = rows
         self.cols = cols
         self.tiles = []
+        self._empty = CellSet()
         for i in range(rows):
             row_tiles = []
-            for i in range(cols):
+            for j in range(cols):
                 row_tiles.append(None)
+                self._empty.add((i, j))
             self.tiles.append(row_tiles)
+        # Sum of tile values, kept up to date by __setitem__
+        self._score = 0
 
     def has_empty(self) -> bool:
         """Is there at least one grid element without a tile?"""
-        for row in self.tiles:
-            for tile in row:
-                if tile is None:
-                    return True
-        return False
+        return len(self._empty) > 0
 
     def _empty_positions(self) -> List[Vec]:
         """Return a list of positions of None values,
-        i.e., unoccupied spaces.
+        i.e., unoccupied spaces (in no particular order).
         """
-        empties = []
-        for row_i, row in enumerate(self.tiles):
-            for col_i, col in enumerate(row):
-                if col is None:
-                    empties.append(Vec(row_i, col_i))
-        return empties
+        return [Vec(row, col) for row, col in self._empty]
 
     def in_bounds(self, pos: Vec) -> bool:
         """Is position (pos.x, pos.y) a legal position on the board?"""
@@ -124,26 +170,29 @@ class Board(GameElement):
         given values, where 0 represents an empty space."""
         for row_i, row in enumerate(values):
             for val_i, val in enumerate(row):
+                pos = Vec(row_i, val_i)
                 if val == 0:
-                    self.tiles[row_i][val_i] = None
+                    self[pos] = None
                 else:
-                    self.tiles[row_i][val_i] = Tile(Vec(row_i, val_i), val)
-
-    def place_tile(self, value=None):
-        """Place a tile on a randomly chosen empty square."""
-        empties = self._empty_positions()
-        assert len(empties) > 0
-        choice = random.choice(empties)
-        row, col = choice.x_dist, choice.y_dist
+                    self[pos] = Tile(pos, val)
+
+    def place_tile(self, value=None) -> Tile:
+        """Place a tile on a randomly chosen empty square.
+        Returns the new tile.
+        """
+        assert len(self._empty) > 0
+        row, col = self._empty.choice(self.rng)
         if value is None:
             # 0.1 probability of 4
-            if random.random() > 0.1:
+            if self.rng.random() > 0.1:
                 value = 2
             else:
                 value = 4
         new_tile = Tile(Vec(row, col), value)
-        self.tiles[row][col] = new_tile
-        self.notify_all(GameEvent(EventKind.tile_created, new_tile))
+        self[Vec(row, col)] = new_tile
+        if self._listeners:
+            self.notify_all(GameEvent(EventKind.tile_created, new_tile))
+        return new_tile
 
     def slide(self, pos: Vec,  direc: Vec):
         """Slide tile at row,col (if any)
@@ -159,8 +208,13 @@ class Board(GameElement):
             if self[new_pos] is None:
                 self._move_tile(pos, new_pos)
             elif self[pos] == self[new_pos]:
-                self[pos].merge(self[new_pos])
-                self._move_tile(pos, new_pos)
+                # Lift the tile off the board while it grows, so
+                # the score counts its new value only once
+                tile = self[pos]
+                self[pos] = None
+                tile.merge(self[new_pos])
+                tile.move_to(new_pos)
+                self[new_pos] = tile
                 break  # Stop moving when we merge with another tile
             else:
                 # Stuck against another tile
@@ -176,34 +230,93 @@ class Board(GameElement):
         return self.tiles[pos.x_dist][pos.y_dist]
 
     def __setitem__(self, pos: Vec, tile: Tile):
+        old = self.tiles[pos.x_dist][pos.y_dist]
+        if old is not None:
+            self._score -= old.value
         self.tiles[pos.x_dist][pos.y_dist] = tile
+        if tile is None:
+            self._empty.add((pos.x_dist, pos.y_dist))
+        else:
+            self._empty.discard((pos.x_dist, pos.y_dist))
+            self._score += tile.value
+
+    def _compact(self, line: List[Vec]):
+        """Move every tile in line toward line[0], in one pass.
+        Tiles nearest line[0] move first, as in slide: each tile
+        moves to the first free position, unless the tile it
+        reaches has the same value, in which case it absorbs that
+        tile and takes its position (where the next tile may in
+        turn absorb it).
+        """
+        filled = 0      # Positions line[0:filled] hold settled tiles
+        last = None     # The tile at line[filled - 1]
+        for pos in line:
+            tile = self[pos]
+            if tile is None:
+                continue
+            merging = last is not None and last == tile
+            if merging:
+                target = line[filled - 1]
+            else:
+                target = line[filled]
+                filled += 1
+            if target != pos:
+                self[pos] = None
+                if merging:
+                    # Merged off the board, so the score counts
+                    # the new value only once
+                    tile.merge(last)
+                self[target] = tile
+                tile.move_to(target)
+            last = tile
+
+    def _move(self, lines: List[List[Vec]]):
+        """Compact each line toward its first position"""
+        for line in lines:
+            self._compact(line)
+
+    def _rows(self) -> List[List[Vec]]:
+        return [[Vec(row, col) for col in range(self.cols)]
+                for row in range(self.rows)]
 
-    def _move(self, starting_pos: Vec, slide_dir: Vec, row_dir: Vec, col_dir: Vec):
-        '''the repeatable code to call slide'''
-        current_pos = starting_pos
-        col_pos = starting_pos
-        for i in range(1, GRID_SIZE + 1):
-            for i in range(1, GRID_SIZE + 1):
-                self.slide(current_pos, slide_dir)
-                current_pos += row_dir
-            col_pos += col_dir
-            current_pos = col_pos
+    def _cols(self) -> List[List[Vec]]:
+        return [[Vec(row, col) for row in range(self.rows)]
+                for col in range(self.cols)]
 
     def right(self):
         '''move all tiles right'''
-        self._move(Vec(0,3), Vec(0,1), Vec(0,-1), Vec(1,0))
+        self._move([row[::-1] for row in self._rows()])
 
     def left(self):
         '''move all tiles left'''
-        self._move(Vec(0,0), Vec(0,-1), Vec(0,1), Vec(1,0))
+        self._move(self._rows())
 
     def up(self):
         '''move all tiles up'''
-        self._move(Vec(0,0), Vec(-1,0), Vec(0,1), Vec(1,0))
+        self._move(self._cols())
 
     def down(self):
         '''move all tiles down'''
-        self._move(Vec(3,0), Vec(1,0), Vec(0,1), Vec(-1,0))
+        self._move([col[::-1] for col in self._cols()])
+
+    def legal_moves(self) -> List[str]:
+        """Names of the moves ("left", "right", "up", "down")
+        that would change the board, found without moving
+        anything.  (The game permits ineffective moves too.)
+        Each call scans every line, O(rows * cols): a deliberate
+        simplification for small boards.  Unlike score, this is
+        not kept up to date in __setitem__, which would tax every
+        move for a query that moves never make.  For fast search
+        on 4x4 boards, use bitboard.legal_moves.
+        """
+        rows = self.tiles
+        cols = [list(col) for col in zip(*self.tiles)]
+        lines = {"left": rows,
+                 "right": [row[::-1] for row in rows],
+                 "up": cols,
+                 "down": [col[::-1] for col in cols]}
+        return [move for move, move_lines in lines.items()
+                if any(_can_slide(line) for line in move_lines)]
 
     def score(self) -> int:
         """Calculate a score from the board.
@@ -211,9 +324,21 @@ class Board(GameElement):
         based on sequence of moves rather than state of
         board.
         """
-        score = 0
-        for row in self.tiles:
-            for col in row:
-                if col is not None:
-                    score += col.value
-        return score
+        return self._score
+
+
+def _can_slide(line: List[Optional[Tile]]) -> bool:
+    """Would anything in this line move toward index 0?
+    Only if some tile has an empty space ahead of it or
+    is next to a tile it would merge with.
+    """
+    gap = False
+    ahead = None
+    for tile in line:
+        if tile is None:
+            gap = True
+        elif gap or (ahead is not None and ahead == tile):
+            return True
+        else:
+            ahead = tile
+    return False
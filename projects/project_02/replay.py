@@ -0,0 +1,189 @@
+"""
+Compact replays of 512 games, for auditing recorded sessions.
+
+A game is determined by the seed of the random source that
+places its tiles and by the player's moves, so that is all a
+replay needs; it also keeps the value of each placed tile and
+the final score as checks.  Replaying re-runs the game through
+model.Board with no view attached and confirms that every
+placed tile and the final score come out the same.
+
+Binary format (little-endian), one record per game, records
+simply concatenated in a file:
+    header   "512R", version (1 byte), rows, cols (1 byte each),
+             seed (8 bytes), number of turns (4 bytes),
+             final score (8 bytes)
+    turns    1 byte each: exponent of the placed tile in the
+             high 5 bits, move in the low 3 bits (index in
+             MOVES, or NO_MOVE for the first turn)
+
+Run as a script:
+    python replay.py record 1000 games.512r --seed 7
+    python replay.py check games.512r
+"""
+
+import argparse
+import random
+import struct
+import sys
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+import game_manager
+import model
+
+MAGIC = b"512R"
+# Replays are only valid for the tile placement code that
+# recorded them; change the version if place_tile changes.
+VERSION = 1
+HEADER = struct.Struct("<4sBBBQIQ")
+MOVES = game_manager.MOVES
+NO_MOVE = 7
+SEED_LIMIT = 1 << 64   # Seeds are stored as unsigned 64-bit integers
+
+
+class ReplayMismatch(Exception):
+    """Re-simulating a replay did not reproduce the recorded game"""
+    pass
+
+
+class Replay:
+    """One recorded game: the seed for tile placement, and for
+    each turn the value of the tile placed and the move made
+    (None for the first turn, before any move).
+    """
+
+    def __init__(self, seed: int, turns: List[Tuple[int, Optional[str]]],
+                 score: int, rows: int = model.GRID_SIZE, cols: int = model.GRID_SIZE):
+        self.seed = seed
+        self.turns = turns
+        self.score = score
+        self.rows = rows
+        self.cols = cols
+
+    def __eq__(self, other: "Replay") -> bool:
+        return (self.seed, self.turns, self.score, self.rows, self.cols) == \
+               (other.seed, other.turns, other.score, other.rows, other.cols)
+
+    def __repr__(self) -> str:
+        return f"Replay(seed={self.seed}, {len(self.turns)} turns, score={self.score})"
+
+    def to_bytes(self) -> bytes:
+        header = HEADER.pack(MAGIC, VERSION, self.rows, self.cols,
+                             self.seed, len(self.turns), self.score)
+        codes = bytearray()
+        for value, move in self.turns:
+            exp = value.bit_length() - 1
+            assert value == 1 << exp and exp < 32, f"Cannot record tile {value}"
+            codes.append(exp << 3 | (NO_MOVE if move is None else MOVES.index(move)))
+        return header + bytes(codes)
+
+    @staticmethod
+    def read(file: BinaryIO) -> Optional["Replay"]:
+        """The next replay in file, or None at end of file"""
+        header = file.read(HEADER.size)
+        if not header:
+            return None
+        if len(header) < HEADER.size:
+            raise ValueError("Truncated replay header")
+        magic, version, rows, cols, seed, n_turns, score = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a version {VERSION} replay")
+        codes = file.read(n_turns)
+        if len(codes) < n_turns:
+            raise ValueError("Truncated replay")
+        turns = [(1 << (code >> 3), None if code & 7 == NO_MOVE else MOVES[code & 7])
+                 for code in codes]
+        return Replay(seed, turns, score, rows, cols)
+
+
+def read_replays(file: BinaryIO) -> Iterator[Replay]:
+    """Each replay in file, one at a time"""
+    while True:
+        rec = Replay.read(file)
+        if rec is None:
+            return
+        yield rec
+
+
+def record_game(policy: game_manager.Policy, seed: int,
+                rows: int = model.GRID_SIZE, cols: int = model.GRID_SIZE) -> Replay:
+    """Play a headless game and record it.  The seeded random
+    source is used only for placing tiles, so that the game can
+    be replayed without the policy.  seed must be in
+    0 <= seed < 2**64, so that it fits in the replay header.
+    """
+    if not 0 <= seed < SEED_LIMIT:
+        raise ValueError(f"Replay seed must be in 0 <= seed < 2**64, not {seed}")
+    turns = []
+    board = game_manager.play_headless(policy, random.Random(seed), rows, cols, turns)
+    return Replay(seed, turns, board.score(), rows, cols)
+
+
+def replay(rec: Replay) -> model.Board:
+    """Re-simulate a recorded game, raising ReplayMismatch
+    if it does not turn out as recorded.
+    """
+    board = model.Board(rec.rows, rec.cols, rng=random.Random(rec.seed))
+    for turn, (value, move) in enumerate(rec.turns):
+        if turn > 0 and not board.has_empty():
+            raise ReplayMismatch(f"{rec}: game over before turn {turn}")
+        placed = board.place_tile().value
+        if placed != value:
+            raise ReplayMismatch(f"{rec}: turn {turn} placed {placed}, recorded {value}")
+        if move is not None:
+            getattr(board, move)()
+    if board.has_empty():
+        raise ReplayMismatch(f"{rec}: game not over after last turn")
+    if board.score() != rec.score:
+        raise ReplayMismatch(f"{rec}: final score {board.score()}")
+    return board
+
+
+def seed_arg(text: str) -> int:
+    """argparse type for a seed that fits in a replay header"""
+    seed = int(text)
+    if not 0 <= seed < SEED_LIMIT:
+        raise argparse.ArgumentTypeError(f"seed must be in 0 <= seed < 2**64, not {seed}")
+    return seed
+
+
+def cli() -> object:
+    """Command line interface returns an object with
+    an instance variable for each command line argument.
+    """
+    parser = argparse.ArgumentParser(description="Record and check 512 replays")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="Record random games")
+    record.add_argument("games", type=int)
+    record.add_argument("file", type=argparse.FileType("wb"))
+    record.add_argument("--seed", type=seed_arg, default=0,
+                        help="Seed of the first game; game i uses seed + i")
+    check = commands.add_parser("check", help="Replay and check recorded games")
+    check.add_argument("file", type=argparse.FileType("rb"))
+    return parser.parse_args()
+
+
+def main():
+    args = cli()
+    if args.command == "record":
+        if args.seed + args.games > SEED_LIMIT:
+            sys.exit(f"Seeds {args.seed} to {args.seed + args.games - 1} do not all fit in 64 bits")
+        for game in range(args.games):
+            # Seeded from a string, so the policy's stream shares
+            # nothing with any game's tile seed
+            policy = game_manager.random_policy(random.Random(f"policy-{args.seed}-{game}"))
+            args.file.write(record_game(policy, args.seed + game).to_bytes())
+        return
+    checked, bad = 0, 0
+    for rec in read_replays(args.file):
+        checked += 1
+        try:
+            replay(rec)
+        except ReplayMismatch as e:
+            bad += 1
+            print(e, file=sys.stderr)
+    print(f"{checked} games checked, {bad} mismatched")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Tests for ai_player.py.
+"""
+import random
+import unittest
+
+import ai_player
+import bitboard
+import model
+
+# No two neighbors alike: no move changes it
+STUCK = [[2, 4, 2, 4],
+         [4, 2, 4, 2],
+         [2, 4, 2, 4],
+         [4, 2, 4, 2]]
+
+
+def random_boards(count: int, seed: int):
+    """Boards from random play, each with at least one legal move"""
+    rng = random.Random(seed)
+    boards = []
+    while len(boards) < count:
+        board = bitboard.place_tile(0, rng=rng)
+        for _ in range(rng.randrange(1, 60)):
+            if not bitboard.empty_cells(board):
+                break
+            board = bitboard.place_tile(board, rng=rng)
+            board = bitboard.MOVES[rng.choice(list(bitboard.MOVES))](board)
+        if bitboard.legal_moves(board):
+            boards.append(board)
+    return boards
+
+
+class TestPlayers(unittest.TestCase):
+
+    def test_choices_are_legal(self):
+        players = [ai_player.ExpectimaxPlayer(depth=1),
+                   ai_player.ExpectimaxPlayer(depth=2),
+                   ai_player.RolloutPlayer(rollouts=3, seed=12)]
+        for board in random_boards(20, seed=12):
+            for player in players:
+                self.assertIn(player.choose(board), bitboard.legal_moves(board))
+
+    def test_choose_model_board(self):
+        board = model.Board()
+        board.from_list([[2, 2, 0, 0],
+                         [0, 0, 0, 0],
+                         [0, 0, 0, 0],
+                         [0, 0, 0, 0]])
+        legal = bitboard.legal_moves(ai_player.as_bitboard(board))
+        self.assertIn(ai_player.ExpectimaxPlayer().choose(board), legal)
+
+    def test_stuck_board_is_lost(self):
+        player = ai_player.ExpectimaxPlayer(depth=2)
+        stuck = bitboard.from_list(STUCK)
+        self.assertEqual(bitboard.legal_moves(stuck), [])
+        for depth in range(3):
+            self.assertEqual(player._chance(stuck, depth), ai_player.LOST)
+
+    def test_transposition_table_reused(self):
+        player = ai_player.ExpectimaxPlayer(depth=2)
+        board = random_boards(1, seed=3)[0]
+        first = player._chance(board, 1)
+        evaluated = player.evaluated
+        table = player._table
+        self.assertIn((board, 1), table)
+        self.assertEqual(player._chance(board, 1), first)
+        self.assertEqual(player.evaluated, evaluated)
+        self.assertIs(player._table, table)
+
+    def test_play_is_repeatable(self):
+        for make_player in (lambda: ai_player.ExpectimaxPlayer(depth=1),
+                            lambda: ai_player.RolloutPlayer(rollouts=2, seed=7)):
+            first = ai_player.play(make_player(), seed=211)
+            second = ai_player.play(make_player(), seed=211)
+            self.assertEqual(first.to_list(), second.to_list())
+            self.assertEqual(first.score(), second.score())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+Tests for batch_board.py: every board in a batch must move
+exactly as model.Board does.
+"""
+import random
+import unittest
+
+import numpy as np
+
+import batch_board
+import model
+from test_bitboard import random_values
+
+MOVES = batch_board.MOVES
+
+
+def model_move(values, move: str):
+    board = model.Board()
+    board.from_list(values)
+    getattr(board, move)()
+    return board.to_list()
+
+
+class TestBatchBoard(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(14)
+        self.values = [random_values(rng) for _ in range(300)]
+        self.boards = batch_board.BatchBoard(len(self.values), seed=14)
+        self.boards.from_lists(self.values)
+
+    def test_round_trip(self):
+        self.assertEqual(self.boards.to_lists(), self.values)
+        self.assertEqual(self.boards.score().tolist(),
+                         [sum(map(sum, values)) for values in self.values])
+
+    def test_same_as_model(self):
+        for move in MOVES:
+            boards = batch_board.BatchBoard(len(self.values))
+            boards.from_lists(self.values)
+            getattr(boards, move)()
+            self.assertEqual(boards.to_lists(),
+                             [model_move(values, move) for values in self.values],
+                             move)
+
+    def test_move_where(self):
+        rng = np.random.default_rng(7)
+        actions = rng.integers(0, 4, size=len(self.values))
+        where = rng.random(len(self.values)) < 0.5
+        self.boards.move(actions, where=where)
+        for i, values in enumerate(self.values):
+            expected = model_move(values, MOVES[actions[i]]) if where[i] else values
+            self.assertEqual(self.boards.to_lists()[i], expected, f"board {i}")
+
+    def test_place_tile_where(self):
+        where = np.arange(len(self.values)) % 3 == 0
+        before = self.boards.values()
+        self.boards.place_tile(where=where)
+        after = self.boards.values()
+        for i in range(len(self.values)):
+            changed = np.argwhere(before[i] != after[i])
+            if where[i] and (before[i] == 0).any():
+                self.assertEqual(len(changed), 1, f"board {i}")
+                row, col = changed[0]
+                self.assertEqual(before[i][row, col], 0)
+                self.assertIn(after[i][row, col], (2, 4))
+            else:
+                self.assertEqual(len(changed), 0, f"board {i}")
+
+
+if __name__ == "__main__":
+    unittest.main()
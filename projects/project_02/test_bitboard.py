@@ -0,0 +1,71 @@
+"""
+Tests for bitboard.py: the bitboard engine must agree
+with model.Board on every move.
+"""
+import random
+import unittest
+
+import bitboard
+import model
+
+MOVES = ["left", "right", "up", "down"]
+
+
+def random_values(rng: random.Random):
+    return [[rng.choice([0, 0, 0, 2, 2, 4, 8, 16]) for _ in range(4)]
+            for _ in range(4)]
+
+
+class TestBitboard(unittest.TestCase):
+
+    def test_round_trip(self):
+        values = [[2, 0, 0, 4],
+                  [0, 8, 0, 0],
+                  [0, 0, 32768, 0],
+                  [1024, 0, 0, 2]]
+        self.assertEqual(bitboard.to_list(bitboard.from_list(values)), values)
+
+    def test_bad_value(self):
+        with self.assertRaises(ValueError):
+            bitboard.from_list([[3, 0, 0, 0]] + [[0] * 4] * 3)
+
+    def test_cascading_merge(self):
+        """The example from the README: 4 2 2 8 right gives _ _ 8 8"""
+        board = bitboard.from_list([[4, 2, 2, 8]] + [[0] * 4] * 3)
+        self.assertEqual(bitboard.to_list(bitboard.right(board))[0],
+                         [0, 0, 8, 8])
+
+    def test_same_as_model(self):
+        rng = random.Random(512)
+        for _ in range(500):
+            values = random_values(rng)
+            board = bitboard.from_list(values)
+            self.assertEqual(bitboard.score(board), sum(map(sum, values)))
+            for move in MOVES:
+                model_board = model.Board()
+                model_board.from_list(values)
+                getattr(model_board, move)()
+                self.assertEqual(bitboard.to_list(bitboard.MOVES[move](board)),
+                                 model_board.to_list(), f"{move} {values}")
+
+    def test_legal_moves(self):
+        rng = random.Random(15)
+        for _ in range(500):
+            values = random_values(rng)
+            model_board = model.Board()
+            model_board.from_list(values)
+            self.assertEqual(bitboard.legal_moves(bitboard.from_list(values)),
+                             model_board.legal_moves())
+
+    def test_place_tile(self):
+        board = bitboard.from_list([[2, 4, 8, 16],
+                                    [2, 4, 8, 16],
+                                    [2, 4, 0, 16],
+                                    [2, 4, 8, 16]])
+        board = bitboard.place_tile(board, value=2)
+        self.assertEqual(bitboard.to_list(board)[2][2], 2)
+        self.assertEqual(bitboard.empty_cells(board), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
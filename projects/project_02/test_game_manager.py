@@ -0,0 +1,28 @@
+"""
+Tests for the headless parts of game_manager.py.
+"""
+import random
+import unittest
+
+import game_manager
+
+
+class TestSummarize(unittest.TestCase):
+
+    def test_deciles_within_range(self):
+        rng = random.Random(13)
+        for games in [2, 3, 5, 10, 50]:
+            scores = [rng.randrange(100, 400) for _ in range(games)]
+            summary = game_manager.summarize(scores)
+            self.assertLessEqual(summary["min"], summary["p10"], scores)
+            self.assertLessEqual(summary["p10"], summary["median"], scores)
+            self.assertLessEqual(summary["median"], summary["p90"], scores)
+            self.assertLessEqual(summary["p90"], summary["max"], scores)
+
+    def test_simulate_repeatable(self):
+        self.assertEqual(game_manager.simulate(5, seed=1),
+                         game_manager.simulate(5, seed=1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,9 +5,11 @@ Note that the unittest module predates PEP-8 guidelines, which
 is why we have a bunch of names that don't comply with the
 standard.
 """
+import game_element
 import model
 from model import Vec, Board, Tile
 import unittest
+import random
 import sys
 
 class TestMove(unittest.TestCase):
@@ -85,5 +87,234 @@ class TestMove(unittest.TestCase):
         # board_diff(actual, expected)
         self.assertEqual(actual, expected)
 
+class TestAnySize(unittest.TestCase):
+    """Moves on boards of any shape must match sliding
+    one tile at a time, nearest the edge first.
+    """
+
+    @staticmethod
+    def slide_all(board: Board, move: str):
+        rows, cols = range(board.rows), range(board.cols)
+        if move == "left":
+            cells, direc = [(r, c) for r in rows for c in cols], Vec(0, -1)
+        elif move == "right":
+            cells, direc = [(r, c) for r in rows for c in reversed(cols)], Vec(0, 1)
+        elif move == "up":
+            cells, direc = [(r, c) for c in cols for r in rows], Vec(-1, 0)
+        else:
+            cells, direc = [(r, c) for c in cols for r in reversed(rows)], Vec(1, 0)
+        for r, c in cells:
+            board.slide(Vec(r, c), direc)
+
+    def test_same_as_slide(self):
+        rng = random.Random(17)
+        for rows, cols in [(1, 1), (2, 7), (5, 3), (8, 8), (16, 16)]:
+            for _ in range(20):
+                values = [[rng.choice([0, 0, 2, 2, 4, 8]) for _ in range(cols)]
+                          for _ in range(rows)]
+                for move in ["left", "right", "up", "down"]:
+                    board = Board(rows, cols)
+                    board.from_list(values)
+                    getattr(board, move)()
+                    expected = Board(rows, cols)
+                    expected.from_list(values)
+                    self.slide_all(expected, move)
+                    self.assertEqual(board.to_list(), expected.to_list())
+                    for r in range(rows):
+                        for c in range(cols):
+                            tile = board[Vec(r, c)]
+                            if tile is not None:
+                                self.assertEqual((tile.row, tile.col), (r, c))
+
+
+class TestLegalMoves(unittest.TestCase):
+    """legal_moves must not change the board"""
+
+    def test_stuck_right(self):
+        """The 'ineffective move' example from the README"""
+        board = model.Board()
+        board.from_list([[2, 4, 8, 16],
+                         [2, 4, 8, 16],
+                         [0, 0, 8, 16],
+                         [0, 0, 8, 16]])
+        self.assertEqual(board.legal_moves(), ["left", "up", "down"])
+        self.assertEqual(board.to_list(),
+                         [[2, 4, 8, 16],
+                          [2, 4, 8, 16],
+                          [0, 0, 8, 16],
+                          [0, 0, 8, 16]])
+
+    def test_no_moves(self):
+        board = model.Board()
+        board.from_list([[2, 4, 2, 4],
+                         [4, 2, 4, 2],
+                         [2, 4, 2, 4],
+                         [4, 2, 4, 2]])
+        self.assertEqual(board.legal_moves(), [])
+
+    def test_merge_only(self):
+        board = model.Board()
+        board.from_list([[2, 2, 4, 8],
+                         [4, 8, 16, 32],
+                         [8, 16, 32, 64],
+                         [16, 32, 64, 128]])
+        self.assertEqual(board.legal_moves(), ["left", "right"])
+
+    def test_same_as_moving(self):
+        rng = random.Random(15)
+        for _ in range(200):
+            values = [[rng.choice([0, 2, 4, 8]) for _ in range(4)]
+                      for _ in range(4)]
+            board = model.Board()
+            board.from_list(values)
+            expected = []
+            for move in ["left", "right", "up", "down"]:
+                moved = model.Board()
+                moved.from_list(values)
+                getattr(moved, move)()
+                if moved.to_list() != values:
+                    expected.append(move)
+            self.assertEqual(board.legal_moves(), expected)
+
+
+class TestBookkeeping(unittest.TestCase):
+    """Score and empty cells are tracked incrementally;
+    they must agree with the tiles actually on the board.
+    """
+
+    def test_random_game(self):
+        rng = random.Random(16)
+        board = model.Board(rng=rng)
+        board.place_tile()
+        while board.has_empty():
+            board.place_tile()
+            getattr(board, rng.choice(["left", "right", "up", "down"]))()
+            values = board.to_list()
+            self.assertEqual(board.score(), sum(map(sum, values)))
+            empties = sorted((pos.x_dist, pos.y_dist)
+                             for pos in board._empty_positions())
+            self.assertEqual(empties,
+                             [(row, col) for row in range(4) for col in range(4)
+                              if values[row][col] == 0])
+        self.assertTrue(all(all(row) for row in board.to_list()))
+
+    def test_from_list(self):
+        board = model.Board()
+        board.from_list([[2, 0, 0, 4],
+                         [0, 0, 0, 0],
+                         [0, 0, 0, 0],
+                         [0, 0, 0, 8]])
+        self.assertEqual(board.score(), 14)
+        self.assertEqual(len(board._empty_positions()), 13)
+
+    def test_partial_from_list(self):
+        board = model.Board()
+        board.from_list([[2] * 4] * 4)
+        board.from_list([[4]])
+        self.assertEqual(board.score(), 34)
+
+    def test_setitem(self):
+        board = model.Board()
+        board[Vec(0, 0)] = Tile(Vec(0, 0), 8)
+        board[Vec(0, 3)] = Tile(Vec(0, 3), 8)
+        self.assertEqual(board.score(), 16)
+        board[Vec(0, 3)] = Tile(Vec(0, 3), 2)
+        self.assertEqual(board.score(), 10)
+        board.slide(Vec(0, 3), Vec(0, -1))
+        self.assertEqual(board.score(), 10)
+        board[Vec(0, 0)] = None
+        self.assertEqual(board.score(), 2)
+
+
+class Recorder(game_element.GameListener):
+    """Listens to every tile, recording the events it receives"""
+    def __init__(self):
+        self.events = []
+        self.redraws = 0
+
+    def notify(self, event: game_element.GameEvent):
+        if event.kind == game_element.EventKind.tile_created:
+            event.tile.add_listener(self)
+        self.events.append((event.kind, repr(event.tile)))
+        game_element.after_frame(self.redraw)
+
+    def redraw(self):
+        self.redraws += 1
+
+
+class TestFrame(unittest.TestCase):
+
+    def setUp(self):
+        """The example from the README: 4 2 2 8 right gives _ _ 8 8"""
+        self.board = Board()
+        self.recorder = Recorder()
+        for col, value in enumerate([4, 2, 2, 8]):
+            tile = Tile(Vec(0, col), value)
+            tile.add_listener(self.recorder)
+            self.board[Vec(0, col)] = tile
+        self.assertEqual(self.board.score(), 16)
+
+    def test_unbatched(self):
+        self.board.right()
+        self.assertEqual(self.recorder.redraws, len(self.recorder.events))
+        self.assertGreater(len(self.recorder.events), 3)
+
+    def test_coalesced(self):
+        with game_element.frame():
+            self.board.right()
+            self.assertEqual(self.recorder.events, [])
+        kinds = [kind for kind, tile in self.recorder.events]
+        # One event per changed tile, and one redraw for all of them
+        self.assertEqual(len(kinds), len(set(tile for kind, tile in self.recorder.events)))
+        self.assertEqual(kinds.count(game_element.EventKind.tile_removed), 2)
+        self.assertEqual(self.recorder.redraws, 1)
+        self.assertEqual(self.board.score(), 16)
+
+    def test_moved_then_absorbed(self):
+        """_ 2 _ 2 left: the first 2 slides to column 0 and is then
+        absorbed.  Its only event is tile_removed, which must carry
+        the position it slid to, so a view can slide it before
+        removing it.
+        """
+        board = Board(1, 4)
+        recorder = Recorder()
+        tiles = {}
+        for col in (1, 3):
+            tiles[col] = Tile(Vec(0, col), 2)
+            tiles[col].add_listener(recorder)
+            board[Vec(0, col)] = tiles[col]
+        with game_element.frame():
+            board.left()
+        self.assertEqual(board.to_list(), [[4, 0, 0, 0]])
+        self.assertEqual(recorder.events,
+                         [(game_element.EventKind.tile_removed, "Tile[0,0]:2"),
+                          (game_element.EventKind.tile_updated, "Tile[0,0]:4")])
+
+
+class TestProfile(unittest.TestCase):
+
+    def tearDown(self):
+        game_element.stop_profile()
+
+    def test_counts_and_moves(self):
+        board = Board(1, 2)   # Two 2s, which must merge
+        board.add_listener(Recorder())
+        profile = game_element.start_profile()
+        board.place_tile(2)
+        board.place_tile(2)
+        with game_element.profile_move("left"), game_element.frame():
+            board.left()
+        self.assertEqual(profile.counts[game_element.EventKind.tile_created], 2)
+        self.assertEqual(len(profile.moves), 1)
+        move = profile.moves[0]
+        self.assertEqual(move["move"], "left")
+        self.assertGreaterEqual(move["seconds"], move["listener_seconds"])
+        self.assertIn("Recorder", profile.listener_seconds)
+        self.assertIn("Recorder.redraw", profile.listener_seconds)
+        self.assertIn("left", profile.report())
+        self.assertIs(game_element.stop_profile(), profile)
+        self.assertIsNone(game_element.stop_profile())
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,44 @@
+"""
+Tests for replay.py: recorded games re-simulate exactly,
+and a tampered replay is caught.
+"""
+import io
+import random
+import unittest
+
+import game_manager
+import replay
+
+
+class TestReplay(unittest.TestCase):
+
+    def test_round_trip(self):
+        buf = io.BytesIO()
+        recorded = []
+        for seed in range(20):
+            policy = game_manager.random_policy(random.Random(1000 + seed))
+            recorded.append(replay.record_game(policy, seed))
+            buf.write(recorded[-1].to_bytes())
+        buf.seek(0)
+        read = list(replay.read_replays(buf))
+        self.assertEqual(read, recorded)
+        for rec in read:
+            self.assertEqual(replay.replay(rec).score(), rec.score)
+
+    def test_mismatch(self):
+        policy = game_manager.random_policy(random.Random(1))
+        rec = replay.record_game(policy, 5)
+        value, move = rec.turns[3]
+        rec.turns[3] = (6 - value, move)   # 2 <-> 4
+        with self.assertRaises(replay.ReplayMismatch):
+            replay.replay(rec)
+
+    def test_bad_seed(self):
+        policy = game_manager.random_policy(random.Random(1))
+        for seed in (-3, 1 << 64):
+            with self.assertRaises(ValueError):
+                replay.record_game(policy, seed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -122,6 +122,7 @@ class GridView(game_element.GameListener):
         self.cell_height = (game.height - MARGIN) / grid_size
         self.tile_height = self.cell_height - MARGIN
         self.tiles = []
+        self._changed = []   # TileViews with changes not yet drawn
         # Initially empty tile spaces
         for row in range(grid_size):
             row_tiles = []
@@ -154,6 +155,38 @@ class GridView(game_element.GameListener):
         else:
             raise Exception("Unexpected event: {}".format(event))
 
+    def changed(self, tile_view: "TileView"):
+        """A tile view has changes to draw.  Within a
+        game_element.frame they are drawn together when the
+        frame's events have all been delivered.
+        """
+        if tile_view not in self._changed:
+            self._changed.append(tile_view)
+        game_element.after_frame(self.redraw)
+
+    def redraw(self):
+        """Draw all pending tile changes: slide the moving tiles
+        together, updating the window once per animation step,
+        then show new values and remove absorbed tiles.
+        """
+        changed, self._changed = self._changed, []
+        moving = [view for view in changed if view.start_slide()]
+        autoflush = self.win.autoflush
+        self.win.autoflush = False
+        try:
+            if moving:
+                step_sleep = ANIMATION_TIME / ANIMATION_STEPS
+                for step in range(ANIMATION_STEPS):
+                    for view in moving:
+                        view.step()
+                    graphics.update()
+                    time.sleep(step_sleep)
+            for view in changed:
+                view.finish()
+            graphics.update()
+        finally:
+            self.win.autoflush = autoflush
+
 
 class TileView(object):
     """A Tile is the thing with a number that slides around the grid.
@@ -174,6 +207,10 @@ class TileView(object):
         self.row = tile.row
         self.col = tile.col
         self.value = tile.value
+        # Latest state of the tile, not yet drawn
+        self.target = (self.row, self.col)
+        self.new_value = self.value
+        self.removed = False
         ul, lr = grid.tile_corners(self.row, self.col)
         background = graphics.Rectangle(ul, lr)
         background.setFill(RAMP[self.value])
@@ -188,37 +225,49 @@ class TileView(object):
         background.draw(self.win)
         label.draw(self.win)
 
-    def slide_to(self, row, col):
-        """Slide the tile to row,col"""
-        ul_new, lr_new = self.grid.tile_corners(row, col)
+    def start_slide(self) -> bool:
+        """Prepare to slide to the tile's new position, one
+        'step' per animation step.  False if it has not moved.
+        """
+        if (self.row, self.col) == self.target:
+            return False
+        ul_new, lr_new = self.grid.tile_corners(*self.target)
         ul_old, lr_old = self.grid.tile_corners(self.row, self.col)
-        self.row, self.col = row, col
-        dx = (ul_new.getX() - ul_old.getX()) / ANIMATION_STEPS
-        dy = (ul_new.getY() - ul_old.getY()) / ANIMATION_STEPS
-        step_sleep = ANIMATION_TIME / ANIMATION_STEPS
-        for step in range(ANIMATION_STEPS):
-            self.background.setOutline(TILE_OUTLINE_OLD)
-            self.background.move(dx, dy)
-            self.label.move(dx, dy)
-            time.sleep(step_sleep)
+        self.row, self.col = self.target
+        self.dx = (ul_new.getX() - ul_old.getX()) / ANIMATION_STEPS
+        self.dy = (ul_new.getY() - ul_old.getY()) / ANIMATION_STEPS
+        self.background.setOutline(TILE_OUTLINE_OLD)
+        return True
+
+    def step(self):
+        self.background.move(self.dx, self.dy)
+        self.label.move(self.dx, self.dy)
+
+    def finish(self):
+        """Show the new value, or remove an absorbed tile"""
+        if self.removed:
+            self.label.undraw()
+            self.background.undraw()
+        elif self.value != self.new_value:
+            self.value = self.new_value
+            self.background.setFill(RAMP[self.value])
+            self.label.setText(str(self.value))
 
     def notify(self, event: game_element.GameEvent):
         """Receive notification of change from a tile.
+        The change is drawn by the grid (see GridView.redraw).
         """
         if event.kind == game_element.EventKind.tile_updated:
-            row, col = event.tile.row, event.tile.col
-            if self.row != row or self.col != col:
-                self.slide_to(row, col)
-            if self.value != event.tile.value:
-                self.value = event.tile.value
-                tile_color = RAMP[event.tile.value]
-                self.background.setFill(tile_color)
-                self.label.setText(str(event.tile.value))
+            self.target = (event.tile.row, event.tile.col)
+            self.new_value = event.tile.value
         elif event.kind == game_element.EventKind.tile_removed:
-            self.label.undraw()
-            self.background.undraw()
+            # A frame may deliver only this event for a tile that
+            # moved before it was absorbed, so slide it there first
+            self.target = (event.tile.row, event.tile.col)
+            self.removed = True
         else:
             raise Exception("Unexpected event {}".format(event))
+        self.grid.changed(self)
 
 
 if __name__ == "__main__":
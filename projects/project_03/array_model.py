@@ -0,0 +1,228 @@
+"""Array-based contagion engine, for large grids.
+
+Same rules as model.Population and its Typical, AtRisk and
+Wanderer individuals, but instead of one object per individual
+the population is a handful of NumPy arrays (health state, time
+in state, kind, neighbor addresses), and a whole day is advanced
+with vectorized operations.  There are no per-individual
+listeners; step() reports how many individuals changed state.
+
+Individuals are numbered in row-major order (row * ncols + col),
+the order in which Population.step visits them.  That order
+matters for one rule: an AtRisk individual turns away visitors
+other than the one it last visited, and whether a visitor arrives
+before or after its host's own visit that day depends on who
+comes first.
+
+Outcomes match the object engine in distribution, not draw for
+draw, since random numbers are drawn in a different order.
+
+Run headless, e.g.:
+    python array_model.py contagion.ini --rows 1000 --cols 1000 --seed 1
+"""
+
+import argparse
+import time
+from typing import Optional
+
+import numpy as np
+
+import config
+from model import Health
+
+# Kinds of individual, in the order Population._random_individual tries them
+KINDS = ["AtRisk", "Typical", "Wanderer"]
+AT_RISK = KINDS.index("AtRisk")
+NO_VISIT = -1   # prior_visit of an AtRisk individual with none pending
+
+VULNERABLE = Health.vulnerable.value
+ASYMPTOMATIC = Health.asymptomatic.value
+SYMPTOMATIC = Health.symptomatic.value
+RECOVERED = Health.recovered.value
+DEAD = Health.dead.value
+
+
+class ArrayPopulation:
+    """A rows x cols grid of individuals, configured (like
+    model.Population) from the config module.
+    """
+
+    def __init__(self, rows: int, cols: int, seed: Optional[int] = None):
+        self.nrows = rows
+        self.ncols = cols
+        n = rows * cols
+        self.rng = np.random.default_rng(seed)
+        self.kind = self._random_kinds(n)
+        self._configure()
+        self.state = np.full(n, VULNERABLE, dtype=np.int8)
+        self.time_in_state = np.zeros(n, dtype=np.int32)
+        self.prior_visit = np.full(n, NO_VISIT, dtype=np.int64)
+        self.neighbors, self.n_neighbors = self._sample_neighbors()
+
+    def _random_kinds(self, n: int) -> np.ndarray:
+        """Kinds with the distribution of Population._random_individual,
+        which tries each kind in turn with its own proportion until
+        one is accepted.
+        """
+        proportions = np.array([config.get_float("Grid", f"Proportion_{kind}")
+                                for kind in KINDS])
+        # Probability that each kind is the first accepted in a round
+        first = proportions * np.cumprod(np.concatenate(([1.0], 1.0 - proportions[:-1])))
+        assert first.sum() > 0, "Some proportion must be positive"
+        return self.rng.choice(len(KINDS), size=n, p=first / first.sum()).astype(np.int8)
+
+    def _configure(self):
+        """Per-kind parameter tables, indexed by kind.  Kinds
+        that do not occur need not be configured.
+        """
+        present = set(np.unique(self.kind))
+        def table(parameter: str, get) -> np.ndarray:
+            return np.array([get(kind, parameter) if k in present else 0
+                             for k, kind in enumerate(KINDS)])
+        self.T_Incubate = table("T_Incubate", config.get_int)
+        self.P_Transmit = table("P_Transmit", config.get_float)
+        self.T_Recover = table("T_Recover", config.get_int)
+        self.P_Death = table("P_Death", config.get_float)
+        self.N_Neighbors = table("N_Neighbors", config.get_int)
+        self.P_Visit = table("P_Visit", config.get_float)
+        self.Visit_Dist = table("Visit_Dist", config.get_int)
+
+    def _sample_neighbors(self):
+        """(n, max neighbors) array of neighbor addresses, each row
+        padded with -1, and the number of neighbors of each individual.
+        As in Population.neighbors, neighbors are distinct and chosen
+        uniformly from the square of side 2 * Visit_Dist + 1 around
+        the individual, clipped to the grid, and there are fewer than
+        N_Neighbors only if the clipped square has fewer other cells.
+        """
+        n = self.nrows * self.ncols
+        rows, cols = np.divmod(np.arange(n), self.ncols)
+        dist = self.Visit_Dist[self.kind]
+        top, bottom = np.maximum(0, rows - dist), np.minimum(self.nrows - 1, rows + dist)
+        left, right = np.maximum(0, cols - dist), np.minimum(self.ncols - 1, cols + dist)
+        width = right - left + 1
+        # Cells of the window other than our own, numbered row by row
+        cells = (bottom - top + 1) * width - 1
+        me = (rows - top) * width + (cols - left)
+        n_neighbors = np.minimum(self.N_Neighbors[self.kind], cells)
+        # Floyd's algorithm: for j from cells - count to cells - 1,
+        # choose t in 0..j, or j itself if t was already chosen
+        chosen = np.full((n, max(1, n_neighbors.max())), -1, dtype=np.int64)
+        for slot in range(chosen.shape[1]):
+            drawing = np.flatnonzero(slot < n_neighbors)
+            j = cells[drawing] - n_neighbors[drawing] + slot
+            t = (self.rng.random(len(drawing)) * (j + 1)).astype(np.int64)
+            taken = (chosen[drawing, :slot] == t[:, np.newaxis]).any(axis=1)
+            chosen[drawing, slot] = np.where(taken, j, t)
+        cell = chosen + (chosen >= me[:, np.newaxis])
+        neighbors = ((top[:, np.newaxis] + cell // width[:, np.newaxis]) * self.ncols
+                     + left[:, np.newaxis] + cell % width[:, np.newaxis])
+        neighbors[chosen < 0] = -1
+        return neighbors, n_neighbors
+
+    def seed(self):
+        """Patient zero"""
+        patient = self.rng.integers(len(self.state))
+        if self.state[patient] == VULNERABLE:
+            self.state[patient] = ASYMPTOMATIC
+            self.time_in_state[patient] = 0
+        else:
+            self.time_in_state[patient] += 1
+
+    def count_in_state(self, state: Health) -> int:
+        """How many individuals are currently in state?"""
+        return int(np.count_nonzero(self.state == state.value))
+
+    def state_grid(self) -> np.ndarray:
+        """rows x cols array of Health values (e.g., Health.dead.value)"""
+        return self.state.reshape(self.nrows, self.ncols)
+
+    def step(self) -> int:
+        """Advance one day, as Population.step; returns the
+        number of individuals whose state changed.
+        """
+        n = len(self.state)
+        state, kind, elapsed = self.state, self.kind, self.time_in_state
+        next_state = state.copy()
+        # Disease progression
+        incubated = (state == ASYMPTOMATIC) & (elapsed > self.T_Incubate[kind])
+        next_state[incubated] = SYMPTOMATIC
+        sick = state == SYMPTOMATIC
+        recovering = sick & (elapsed > self.T_Recover[kind])
+        next_state[recovering] = RECOVERED
+        dying = sick & ~recovering & (self.rng.random(n) < self.P_Death[kind])
+        next_state[dying] = DEAD
+        # Social behavior: who visits whom today
+        visitors = np.flatnonzero((self.rng.random(n) < self.P_Visit[kind])
+                                  & (self.n_neighbors > 0))
+        choice = (self.rng.random(len(visitors)) * self.n_neighbors[visitors]).astype(np.int64)
+        hosts = self.neighbors[visitors, choice]
+        prior_before = self.prior_visit
+        prior_after = prior_before.copy()
+        cautious = kind[visitors] == AT_RISK
+        returning = cautious & (prior_before[visitors] != NO_VISIT)
+        hosts[returning] = prior_before[visitors[returning]]
+        prior_after[visitors[cautious]] = np.where(returning[cautious], NO_VISIT,
+                                                   hosts[cautious])
+        # An AtRisk host welcomes only the individual it last visited,
+        # as of the moment the visitor arrives
+        prior_then = np.where(visitors < hosts, prior_before[hosts], prior_after[hosts])
+        welcome = ((kind[hosts] != AT_RISK) | (prior_then == NO_VISIT)
+                   | (prior_then == visitors))
+        visitors, hosts = visitors[welcome], hosts[welcome]
+        self.prior_visit = prior_after
+        # Each may infect the other
+        contagious = (state == ASYMPTOMATIC) | (state == SYMPTOMATIC)
+        vulnerable = state == VULNERABLE
+        for source, target in ((hosts, visitors), (visitors, hosts)):
+            infects = (contagious[source] & vulnerable[target]
+                       & (self.rng.random(len(source)) < self.P_Transmit[kind[source]]))
+            next_state[target[infects]] = ASYMPTOMATIC
+        # Time passes
+        changed = next_state != state
+        elapsed += 1
+        elapsed[changed] = 0
+        self.state = next_state
+        return int(np.count_nonzero(changed))
+
+
+def cli() -> object:
+    """Command line interface returns an object with
+    an instance variable for each command line argument.
+    """
+    parser = argparse.ArgumentParser(description="Headless array-based contagion model")
+    parser.add_argument("conf", nargs="?", default="contagion.ini")
+    parser.add_argument("--rows", type=int, help="Default from configuration")
+    parser.add_argument("--cols", type=int, help="Default from configuration")
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args()
+
+
+def main():
+    """Run until an epoch of 10 days passes with no state change"""
+    args = cli()
+    config.configure(args.conf)
+    rows = args.rows or config.get_int("Grid", "Rows")
+    cols = args.cols or config.get_int("Grid", "Cols")
+    started = time.perf_counter()
+    population = ArrayPopulation(rows, cols, seed=args.seed)
+    population.seed()
+    day = 0
+    peak, peak_day = 0, 0
+    changes = 1
+    while changes:
+        changes = 0
+        for _ in range(10):
+            day += 1
+            changes += population.step()
+            symptomatic = population.count_in_state(Health.symptomatic)
+            if symptomatic > peak:
+                peak, peak_day = symptomatic, day
+        print(f"Day {day:3}\t{population.count_in_state(Health.symptomatic):6} symptomatic\t"
+              f"{population.count_in_state(Health.dead):6} cumulative deaths")
+    print(f"Peak {peak} symptomatic on day {peak_day}")
+    print(f"{rows}x{cols} grid in {time.perf_counter() - started:.1f} seconds")
+
+
+if __name__ == "__main__":
+    main()
@@ -37,3 +37,22 @@ def get_pcnt(section: str, parameter: str) -> float:
     assert CONF, "Must call configure first"
     param_str = CONF[section][parameter]
     return float(param_str)/100.0
+
+def override(section: str, parameter: str, value):
+    """Change a parameter after configure, e.g., for one run
+    of a parameter sweep.  Section "DEFAULT" changes it for
+    every section that does not set it itself.
+    """
+    assert CONF, "Must call configure first"
+    CONF[section][parameter] = str(value)
+
+def override_all(parameter: str, value):
+    """Change a parameter in DEFAULT and in every section that
+    has it, including sections that set it themselves (where
+    a change to DEFAULT alone would have no effect).
+    """
+    assert CONF, "Must call configure first"
+    for section in CONF.sections():
+        if CONF.has_option(section, parameter):
+            CONF[section][parameter] = str(value)
+    CONF["DEFAULT"][parameter] = str(value)
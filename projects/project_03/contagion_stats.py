@@ -4,11 +4,28 @@ contagion model.
 
 import model
 import config
-import bar_chart
 
 class Stats:
-    def __init__(self, population: model.Population):
+    def __init__(self, population: model.Population, chart: bool = True):
+        """With chart=False no window is opened, e.g.,
+        for headless experiments (see sweep.py).
+        """
         self.pop = population
+        self.chart = None
+        if chart:
+            self._open_chart()
+        #
+        # Summary stats
+        self.max_symptomatic = 0
+        self.max_period_dead = 0
+        self.prior_day_dead = 0
+        self.prior_period_dead = 0
+        self.max_symptomatic_day = 0
+        self.max_deaths_day = 0
+
+    def _open_chart(self):
+        # Imported here because graphics opens a Tk window on import
+        import bar_chart
         # Accompanying chart of current cases and total deaths
         chart_width = config.get_int("Chart", "Width")
         chart_height = config.get_int("Chart", "Height")
@@ -20,14 +37,6 @@ class Stats:
                                 title="Current cases, cumulative deaths")
         # Move the chart out from under the main model view
         self.chart.win.master.geometry(f"{chart_width}x{chart_height}-5+0")
-        #
-        # Summary stats
-        self.max_symptomatic = 0
-        self.max_period_dead = 0
-        self.prior_day_dead = 0
-        self.prior_period_dead = 0
-        self.max_symptomatic_day = 0
-        self.max_deaths_day = 0
 
     def update(self, day=0):
         current_cases = self.pop.count_in_state(model.Health.symptomatic)
@@ -49,6 +58,9 @@ class Stats:
 
         print(f"Day {day:3}\t{current_cases:4} symptomatic\t{deaths:4}" +
               f" cumulative deaths ({new_deaths:4} this period)")
+        if self.chart is None:
+            return
+        import bar_chart
         self.chart.bar(epoch, current_cases,
                   color=bar_chart.color(250, 200, 250))
         self.chart.bar(epoch, deaths,
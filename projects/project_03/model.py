@@ -3,7 +3,7 @@
 
 import random
 import enum
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 import logging
 
 import config
@@ -26,42 +26,143 @@ class Health(enum.Enum):
         return self.name
 
 
+# Configuration parameters of each kind of individual
+PARAMETERS = [("T_Incubate", config.get_int), ("P_Transmit", config.get_float),
+              ("T_Recover", config.get_int), ("P_Death", config.get_float),
+              ("P_Greet", config.get_float), ("N_Neighbors", config.get_int),
+              ("P_Visit", config.get_float), ("Visit_Dist", config.get_int)]
+
+MASK64 = (1 << 64) - 1
+
+
+def _mix64(z: int) -> int:
+    """splitmix64 finalizer: scrambles the bits of a 64-bit integer"""
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+
+class Dice:
+    """The random numbers one individual uses on one day: a
+    splitmix64 sequence whose start depends only on the
+    population's seed, the day and the individual.  They do not
+    depend on who else has drawn random numbers, so skipping
+    individuals who cannot change anything (see Population.step)
+    does not change anyone else's luck.
+    """
+    def __init__(self, seed: int, day: int, index: int):
+        self._state = _mix64(seed ^ _mix64((day << 32) + index))
+
+    def random(self) -> float:
+        """Like random.random"""
+        self._state = (self._state + 0x9E3779B97F4A7C15) & MASK64
+        return (_mix64(self._state) >> 11) * (1.0 / (1 << 53))
+
+    def choice(self, seq):
+        """Like random.choice"""
+        return seq[int(self.random() * len(seq))]
+
+
 class Population(mvc.Listenable):
     """Simple grid organization of individuals"""
 
-    def __init__(self, rows: int, cols: int):
+    def __init__(self, rows: int, cols: int, keep_history: bool = False,
+                 seed: Optional[int] = None):
+        """If keep_history, the number of individuals in each
+        state is recorded after each step, in self.history.
+        seed determines the random numbers used in steps (see
+        Dice); by default it is drawn from the random module,
+        like everything else in setting up the population.
+        """
         super().__init__()
         self.cells = []
         self.nrows = rows
         self.ncols = cols
+        # Configuration is read once per kind, not once per individual
+        self._parameters: Dict[str, Dict[str, float]] = {}
+        self._proportions = [
+            (the_class, config.get_float("Grid", f"Proportion_{the_class.__name__}"))
+            for the_class in (AtRisk, Typical, Wanderer)]
         # Populate according to configuration
         for row_i in range(config.get_int("Grid", "Rows")):
             row = []
             for col_i in range(config.get_int("Grid", "Cols")):
                 row.append(self._random_individual(row_i, col_i))
             self.cells.append(row)
+        # How many individuals in each state, kept up to date
+        # by Individual.tick
+        self._counts = {state: 0 for state in Health}
+        self._counts[Health.vulnerable] = sum(len(row) for row in self.cells)
+        self.history: Optional[List[Dict[Health, int]]] = [] if keep_history else None
+        # Days are numbered from 0; the step on day d draws
+        # random numbers from Dice(seed, d, individual.index)
+        self.day = 0
+        self.seed_value = random.getrandbits(64) if seed is None else seed
+        self._dice: Optional[Dice] = None
+        # For active-set stepping: who is contagious, who might
+        # visit each individual, and who will change state at
+        # the next tick
+        self._contagious = set()
+        self._visitors: List[List[Individual]] = [[] for _ in range(rows * cols)]
+        for row in self.cells:
+            for cell in row:
+                for row_num, col_num in cell.neighbors:
+                    self._visitors[row_num * cols + col_num].append(cell)
+        self._changing = set()
         return
 
     def _random_individual(self, row: int, col: int) -> "Individual":
-        classes = [(AtRisk, config.get_float("Grid", "Proportion_AtRisk")),
-                   (Typical, config.get_float("Grid", "Proportion_Typical")),
-                   (Wanderer, config.get_float("Grid", "Proportion_Wanderer"))]
         while True:
-            for the_class, proportion in classes:
+            for the_class, proportion in self._proportions:
                 dice = random.random()
                 if dice < proportion:
                     return the_class(self, row, col)
 
-    def step(self):
-        """Determine next states"""
+    def parameters(self, kind: str) -> Dict[str, float]:
+        """Configuration parameters of individuals of kind,
+        read from config the first time they are asked for
+        """
+        if kind not in self._parameters:
+            self._parameters[kind] = {name: get(kind, name)
+                                      for name, get in PARAMETERS}
+        return self._parameters[kind]
+
+    def step(self, everyone: bool = False):
+        """Determine next states.  Only individuals who could
+        change anything are stepped: those who are contagious and
+        those who might visit them.  Anyone else's step could only
+        change the plans of an AtRisk individual, who catches up
+        on the steps it missed when that matters (AtRisk.catch_up).
+        With everyone=True, every individual is stepped and ticked,
+        with identical results (given the same seed), but slowly:
+        each individual's Dice is hashed in pure Python, and at
+        300x300 such a step takes about 3x as long as a step
+        drawing from the random module did.  It is meant for
+        checking active-set stepping, not for long runs.
+        """
         log.debug("Population: Step")
+        if everyone:
+            stepping = [cell for row in self.cells for cell in row]
+        else:
+            active = set(self._contagious)
+            for cell in self._contagious:
+                active.update(self._visitors[cell.index])
+            stepping = sorted(active, key=lambda cell: cell.index)
+        for cell in stepping:
+            self._dice = self.dice(cell, self.day)
+            cell.step()
+        self._dice = None
         # Time passes
-        for row in self.cells:
-            for cell in row:
-                cell.step()
-        for row in self.cells:
-            for cell in row:
-                cell.tick()
+        self.day += 1
+        if everyone:
+            ticking = stepping
+        else:
+            ticking = sorted(self._changing, key=lambda cell: cell.index)
+        for cell in ticking:
+            cell.tick()
+        self._changing.clear()
+        if self.history is not None:
+            self.history.append(self.counts())
         self.notify_all("timestep")
 
     def seed(self):
@@ -71,48 +172,58 @@ class Population(mvc.Listenable):
         self.cells[row][col].infect()
         self.cells[row][col].tick()
 
+    def dice(self, individual: "Individual", day: int) -> Dice:
+        """The random numbers of individual on day"""
+        return Dice(self.seed_value, day, individual.index)
+
+    def random(self) -> float:
+        """Random number for the individual now stepping"""
+        return self._dice.random()
+
+    def choice(self, seq):
+        """Random choice for the individual now stepping"""
+        return self._dice.choice(seq)
+
     def count_in_state(self, state: Health) -> int:
         """How many individuals are currently in state?"""
-        tot = 0
-        for row in self.cells:
-            for cell in row:
-                if cell.state == state:
-                    tot += 1
-        return tot
+        return self._counts[state]
+
+    def counts(self) -> Dict[Health, int]:
+        """How many individuals are currently in each state"""
+        return dict(self._counts)
+
+    def _changed_state(self, individual: "Individual", old: Health, new: Health):
+        """Called by an individual whose state has changed"""
+        self._counts[old] -= 1
+        self._counts[new] += 1
+        if new in (Health.asymptomatic, Health.symptomatic):
+            self._contagious.add(individual)
+        else:
+            self._contagious.discard(individual)
+
+    def _will_change(self, individual: "Individual"):
+        """Called by an individual whose next state differs"""
+        self._changing.add(individual)
 
     def neighbors(self, num: int, row: int, col: int, dist: int) -> List[Tuple[int, int]]:
         """Give me addresses of up to num neighbors
-        up to dist away from here(Manhattan distance)
+        up to dist away from here (in rows and in columns),
+        chosen at random without repetition.  Fewer than num
+        only if there are not that many cells within dist.
         """
+        # The window of cells within dist, clipped to the grid,
+        # is a rectangle; number its cells row by row, leave out
+        # our own cell, and sample cell numbers.
+        top, bottom = max(0, row - dist), min(self.nrows - 1, row + dist)
+        left, right = max(0, col - dist), min(self.ncols - 1, col + dist)
+        width = right - left + 1
+        cells = (bottom - top + 1) * width - 1
+        me = (row - top) * width + (col - left)
         result = []
-        count = 0
-        log.debug(f"Cell {row},{col} finding {num} neighbors at distance {dist} " +
-                  f"in {self.nrows},{self.ncols}")
-        attempts = 0
-        while count < num:
-            attempts += 1
-            assert attempts < 1000,(
-                f"Can't find {num} neighbors at distance {dist}")
-            row_step = random.randint(0-dist,dist)
-            col_step = random.randint(0-dist,dist)
-            row_addr = row + row_step
-            col_addr = col + col_step
-            # log.debug(f"Trying neighbor at position {row_addr},{col_addr}")
-            if row_addr < 0 or row_addr >= self.nrows:
-                # log.debug("Bad row")
-                continue
-            if col_addr < 0 or col_addr >= self.ncols:
-                # log.debug("Bad column")
-                continue
-            if row_addr == row and col_addr == 0:
-                # log.debug("Can't visit self")
-                continue
-            neighbor_addr = (row_addr, col_addr)
-            if neighbor_addr in result:
-                continue
-            log.debug(f"{row},{col} adding neighbor at {row_addr},{col_addr}")
-            result.append(neighbor_addr)
-            count += 1
+        for cell in random.sample(range(cells), min(num, cells)):
+            if cell >= me:
+                cell += 1
+            result.append((top + cell // width, left + cell % width))
         return result
 
     def visit(self, address: Tuple[int, int]):
@@ -135,51 +246,64 @@ class Individual(mvc.Listenable):
         self.region = region
         self.row = row
         self.col = col
+        self.index = row * region.ncols + col
         # Initially we are 'vulnerable', not yet infected
-        self._time_in_state = 0  # How long in this state?
+        self._state_day = 0  # Day this state began
         self.state = Health.vulnerable
         self.next_state = Health.vulnerable
         # Configuration parameters based on kind
-        self.T_Incubate = config.get_int(kind, "T_Incubate")
-        self.P_Transmit = config.get_float(kind, "P_Transmit")
-        self.T_Recover = config.get_int(kind, "T_Recover")
-        self.P_Death = config.get_float(kind, "P_Death")
-        self.P_Greet = config.get_float(kind, "P_Greet")
-        self.N_Neighbors = config.get_int(kind, "N_Neighbors")
-        self.P_Visit = config.get_float(kind, "P_Visit")
-        self.Visit_Dist = config.get_int(kind, "Visit_Dist")
+        params = region.parameters(kind)
+        self.T_Incubate = params["T_Incubate"]
+        self.P_Transmit = params["P_Transmit"]
+        self.T_Recover = params["T_Recover"]
+        self.P_Death = params["P_Death"]
+        self.P_Greet = params["P_Greet"]
+        self.N_Neighbors = params["N_Neighbors"]
+        self.P_Visit = params["P_Visit"]
+        self.Visit_Dist = params["Visit_Dist"]
         #list of neighbor addresses
         self.neighbors = region.neighbors(num=self.N_Neighbors,
                                           row=row, col=col,
                                           dist=self.Visit_Dist)
 
+    @property
+    def _time_in_state(self) -> int:
+        """How long in this state?  Counted from the day the
+        state began, so individuals who are not stepped or
+        ticked still age.
+        """
+        return self.region.day - self._state_day
+
     def step(self):
         """Next state"""
         # Basic state transitions are in common
         if self.state == Health.asymptomatic:
             if self._time_in_state > self.T_Incubate:
                 self.next_state = Health.symptomatic
+                self.region._will_change(self)
                 log.debug("Becoming symptomatic")
         if self.state == Health.symptomatic:
             # We could die on any time step before we recover
             if self._time_in_state > self.T_Recover:
                 log.debug(f"Recovery at {self.row},{self.col}")
                 self.next_state = Health.recovered
-            elif random.random() < self.P_Death:
+                self.region._will_change(self)
+            elif self.region.random() < self.P_Death:
                 log.debug(f"Death at {self.row},{self.col}")
                 self.next_state = Health.dead
+                self.region._will_change(self)
 
         # Social behavior differs among concrete classes
         self.social_behavior()
 
     def tick(self):
         """Time passes"""
-        self._time_in_state += 1
         if self.state != self.next_state:
+            self.region._changed_state(self, self.state, self.next_state)
             self.state = self.next_state
             self.notify_all("newstate")
             # Reset clock
-            self._time_in_state = 0
+            self._state_day = self.region.day
 
     def infect(self):
         """Called by another individual spreading germs.
@@ -187,6 +311,7 @@ class Individual(mvc.Listenable):
         """
         if self.state == Health.vulnerable:
             self.next_state = Health.asymptomatic
+            self.region._will_change(self)
 
     def social_behavior(self):
         raise NotImplementedError("Social behavior should be implemented in subclasses")
@@ -204,7 +329,7 @@ class Individual(mvc.Listenable):
         if not other.state == Health.vulnerable:
             return
         # Transmission is possible.  Roll the dice
-        if random.random() < self.P_Transmit:
+        if self.region.random() < self.P_Transmit:
             other.infect()
 
     def _is_contagious(self) -> bool:
@@ -230,8 +355,8 @@ class Typical(Individual):
     
     def social_behavior(self):
         """A typical individual visits neighbors at random"""
-        if random.random() < self.P_Visit:
-            addr = random.choice(self.neighbors)
+        if self.region.random() < self.P_Visit:
+            addr = self.region.choice(self.neighbors)
             neighbor = self.region.visit(addr)
             if neighbor.hello(self):
                 neighbor.meet(self)
@@ -249,26 +374,54 @@ class AtRisk(Individual):
         # the abstract base class
         super().__init__("AtRisk", region, row, col)
         self.prior_visit = None
+        self._planned_through = -1  # Last day whose visit is in prior_visit
 
     def social_behavior(self):
         """The way an AtRisk individual interacts with neighbors"""
-        if random.random() >= self.P_Visit:
+        self.catch_up(self.region.day - 1)
+        self._planned_through = self.region.day
+        neighbor = self._plan_visit(self.region.random, self.region.choice)
+        if neighbor is not None and neighbor.hello(self):
+            neighbor.meet(self)
+
+    def _plan_visit(self, roll, pick) -> Optional[Individual]:
+        """Whom to visit today, if anyone, with roll and pick
+        for random.random and random.choice
+        """
+        if roll() >= self.P_Visit:
             # No visits today! 
-            return
+            return None
         if self.prior_visit is None:
             # Time for someone new
-            addr = random.choice(self.neighbors)
+            addr = pick(self.neighbors)
             neighbor = self.region.visit(addr)
             self.prior_visit = neighbor
         else:
             # Second visit to the same person
             neighbor = self.prior_visit
             self.prior_visit = None
-        if neighbor.hello(self):
-            neighbor.meet(self)
+        return neighbor
+
+    def catch_up(self, day: int):
+        """Bring prior_visit up to date through day, replaying the
+        visits of days this individual was not stepped.  Those were
+        days when neither it nor any of its neighbors was contagious,
+        so the visits could change nothing else, and the dice of
+        those days decide them just as a step would have.
+        """
+        while self._planned_through < day:
+            self._planned_through += 1
+            dice = self.region.dice(self, self._planned_through)
+            self._plan_visit(dice.random, dice.choice)
 
     def hello(self, visitor: "Individual") -> bool:
         """True means 'welcome' and False means 'go away'"""
+        # Has this individual made today's visit yet?  Steps
+        # go in order of index.
+        if self.index < visitor.index:
+            self.catch_up(self.region.day)
+        else:
+            self.catch_up(self.region.day - 1)
         if self.prior_visit is None:
             return True
         elif self.prior_visit == visitor:
@@ -285,8 +438,8 @@ class Wanderer(Individual):
     
     def social_behavior(self):
         """A wanderer individual visits neighbors far and wide"""
-        if random.random() < self.P_Visit:
-            addr = random.choice(self.neighbors)
+        if self.region.random() < self.P_Visit:
+            addr = self.region.choice(self.neighbors)
             neighbor = self.region.visit(addr)
             if neighbor.hello(self):
                 neighbor.meet(self)
@@ -0,0 +1,169 @@
+"""Parameter sweeps: sensitivity analysis of the contagion model.
+
+Runs the model headless (no window, no sleeping) for every
+combination of parameter values in a grid, several replicates
+each, in a process pool.  Each run starts from the base
+configuration file with its own overrides and its own seed, and
+is summarized as contagion_stats.Stats summarizes a run: peak
+symptomatic and its day, peak deaths in a day and its day, and
+total deaths.
+
+Example: 3 x 2 configurations, 20 replicates each:
+    python sweep.py contagion.ini --set P_Transmit=0.2,0.35,0.5 \\
+        --set Grid.Proportion_AtRisk=0.1,0.2 --replicates 20
+
+A parameter without a section is set everywhere it appears: in
+DEFAULT and in every section that has it, e.g., P_Death for each
+kind of individual.
+"""
+
+import argparse
+import csv
+import itertools
+import logging
+import random
+import statistics
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import config
+import contagion_stats
+import model
+
+# (section, parameter) -> value, as strings from the command line;
+# section None means every section (see config.override_all)
+Overrides = Dict[Tuple[Optional[str], str], str]
+MEASURES = ["peak_symptomatic", "peak_symptomatic_day",
+            "peak_deaths", "peak_deaths_day", "deaths", "days"]
+
+
+def parse_override(spec: str) -> Tuple[Tuple[Optional[str], str], List[str]]:
+    """'Section.Param=v1,v2' -> ((Section, Param), [v1, v2]),
+    and 'Param=v1,v2' -> ((None, Param), [v1, v2])
+    """
+    name, _, values = spec.partition("=")
+    section, _, parameter = name.rpartition(".")
+    if not parameter or not values:
+        raise ValueError(f"Expected Section.Param=v1,v2,... but got '{spec}'")
+    return (section or None, parameter), values.split(",")
+
+
+def configurations(grid: Dict[Tuple[str, str], List[str]]) -> List[Overrides]:
+    """Every combination of values in grid"""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+
+
+def run(conf_file: str, overrides: Overrides, seed: int, engine: str = "array") -> Dict[str, int]:
+    """One headless run.  Like contagion.main, it runs 10-day
+    epochs until the epidemic is over, which is when no one is
+    left who could infect anyone or change state.
+    """
+    config.configure(conf_file)
+    for (section, parameter), value in overrides.items():
+        if section is None:
+            config.override_all(parameter, value)
+        else:
+            config.override(section, parameter, value)
+    rows = config.get_int("Grid", "Rows")
+    cols = config.get_int("Grid", "Cols")
+    if engine == "array":
+        import array_model
+        population = array_model.ArrayPopulation(rows, cols, seed=seed)
+    else:
+        model.log.setLevel(logging.WARNING)
+        random.seed(seed)
+        population = model.Population(rows, cols)
+    stats = contagion_stats.Stats(population, chart=False)
+    population.seed()
+    day = 0
+    active = True
+    while active:
+        for _ in range(10):
+            day += 1
+            population.step()
+            stats.update(day=day)
+        active = (population.count_in_state(model.Health.asymptomatic)
+                  + population.count_in_state(model.Health.symptomatic)) > 0
+    return {"peak_symptomatic": stats.max_symptomatic,
+            "peak_symptomatic_day": stats.max_symptomatic_day,
+            "peak_deaths": stats.max_period_dead,
+            "peak_deaths_day": stats.max_deaths_day,
+            "deaths": population.count_in_state(model.Health.dead),
+            "days": day}
+
+
+def _run_task(task: Tuple[str, Overrides, int, str]) -> Dict[str, int]:
+    return run(*task)
+
+
+def sweep(conf_file: str, grid: Dict[Tuple[str, str], List[str]],
+          replicates: int, seed: int = None, workers: int = None,
+          engine: str = "array") -> List[Tuple[Overrides, List[Dict[str, int]]]]:
+    """Results of each replicate of each configuration in grid.
+    Every run gets its own seed, spawned from seed, so the
+    whole sweep can be repeated exactly.
+    """
+    confs = configurations(grid)
+    seeds = np.random.SeedSequence(seed).spawn(len(confs) * replicates)
+    tasks = [(conf_file, overrides, int(seeds[i * replicates + r].generate_state(1)[0]), engine)
+             for i, overrides in enumerate(confs) for r in range(replicates)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_run_task, tasks, chunksize=max(1, replicates // 4)))
+    return [(overrides, results[i * replicates:(i + 1) * replicates])
+            for i, overrides in enumerate(confs)]
+
+
+def summarize(runs: List[Dict[str, int]]) -> Dict[str, float]:
+    """Mean and standard deviation of each measure"""
+    summary = {}
+    for measure in MEASURES:
+        values = [result[measure] for result in runs]
+        summary[f"{measure}_mean"] = statistics.mean(values)
+        summary[f"{measure}_sd"] = statistics.stdev(values) if len(values) > 1 else 0.0
+    return summary
+
+
+def cli() -> object:
+    """Command line interface returns an object with
+    an instance variable for each command line argument.
+    """
+    parser = argparse.ArgumentParser(description="Parameter sweep of the contagion model")
+    parser.add_argument("conf", nargs="?", default="contagion.ini")
+    parser.add_argument("--set", action="append", default=[], dest="overrides",
+                        metavar="SECTION.PARAM=V1,V2",
+                        help="Values to try for a parameter; may be repeated")
+    parser.add_argument("--replicates", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Processes (default: one per CPU)")
+    parser.add_argument("--engine", choices=["array", "object"], default="array",
+                        help="array_model.ArrayPopulation or model.Population")
+    parser.add_argument("--output", type=argparse.FileType("w"), default=sys.stdout,
+                        help="CSV file for the summary (default: standard output)")
+    return parser.parse_args()
+
+
+def main():
+    args = cli()
+    grid = dict(parse_override(spec) for spec in args.overrides)
+    results = sweep(args.conf, grid, args.replicates, args.seed, args.workers, args.engine)
+    names = [parameter if section is None else f"{section}.{parameter}"
+             for section, parameter in grid]
+    writer = None
+    for overrides, runs in results:
+        row = dict(zip(names, overrides.values()))
+        row["replicates"] = len(runs)
+        row.update(summarize(runs))
+        if writer is None:
+            writer = csv.DictWriter(args.output, fieldnames=list(row))
+            writer.writeheader()
+        writer.writerow({key: f"{value:.4g}" if isinstance(value, float) else value
+                         for key, value in row.items()})
+
+
+if __name__ == "__main__":
+    main()
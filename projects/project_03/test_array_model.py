@@ -0,0 +1,152 @@
+"""
+Tests for array_model.py.
+"""
+import math
+import os
+import random
+import statistics
+import unittest
+
+import numpy as np
+
+import array_model
+import config
+import model
+from model import Health
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def outcomes(population, days: int):
+    """Peak symptomatic, dead and ever infected over a run
+    of either engine
+    """
+    peak = 0
+    for _ in range(days):
+        population.step()
+        peak = max(peak, population.count_in_state(Health.symptomatic))
+    size = population.nrows * population.ncols
+    return (peak, population.count_in_state(Health.dead),
+            size - population.count_in_state(Health.vulnerable))
+
+
+class TestArrayPopulation(unittest.TestCase):
+
+    def setUp(self):
+        config.configure(os.path.join(HERE, "contagion.ini"))
+
+    def test_sample_neighbors(self):
+        """Distinct cells of the clipped window, never ourselves,
+        and as many as N_Neighbors unless the window is smaller
+        """
+        population = array_model.ArrayPopulation(15, 25, seed=21)
+        dist = population.Visit_Dist[population.kind]
+        wanted = population.N_Neighbors[population.kind]
+        for index in range(population.nrows * population.ncols):
+            row, col = divmod(index, population.ncols)
+            top, bottom = max(0, row - dist[index]), min(population.nrows - 1, row + dist[index])
+            left, right = max(0, col - dist[index]), min(population.ncols - 1, col + dist[index])
+            window = (bottom - top + 1) * (right - left + 1) - 1
+            count = population.n_neighbors[index]
+            self.assertEqual(count, min(wanted[index], window))
+            neighbors = population.neighbors[index]
+            self.assertTrue((neighbors[count:] == -1).all())
+            chosen = neighbors[:count].tolist()
+            self.assertEqual(len(set(chosen)), count)
+            self.assertNotIn(index, chosen)
+            for neighbor in chosen:
+                neighbor_row, neighbor_col = divmod(neighbor, population.ncols)
+                self.assertTrue(top <= neighbor_row <= bottom)
+                self.assertTrue(left <= neighbor_col <= right)
+
+    def test_counts_sum_to_population(self):
+        population = array_model.ArrayPopulation(30, 30, seed=5)
+        population.seed()
+        for _ in range(50):
+            population.step()
+            total = sum(population.count_in_state(state) for state in Health)
+            self.assertEqual(total, 30 * 30)
+
+    def test_seed_reproduces_run(self):
+        runs = []
+        for _ in range(2):
+            population = array_model.ArrayPopulation(30, 30, seed=9)
+            population.seed()
+            changes = [population.step() for _ in range(50)]
+            runs.append((population.neighbors, population.state, changes))
+        (neighbors1, state1, changes1), (neighbors2, state2, changes2) = runs
+        np.testing.assert_array_equal(neighbors1, neighbors2)
+        np.testing.assert_array_equal(state1, state2)
+        self.assertEqual(changes1, changes2)
+        self.assertGreater(sum(changes1), 0)
+
+    def _welcomed(self, visitor: int, host: int, other: int) -> bool:
+        """On a 1x3 grid where everyone visits every day and every
+        contact infects, a contagious Typical visits an AtRisk host
+        with no visit pending, while the host visits other.  Is the
+        visitor welcomed, i.e., is the host infected?
+        """
+        population = array_model.ArrayPopulation(1, 3, seed=4)
+        population.kind = np.full(3, array_model.KINDS.index("Typical"), dtype=np.int8)
+        population.kind[host] = array_model.AT_RISK
+        population.P_Visit = np.ones(len(array_model.KINDS))
+        population.P_Transmit = np.ones(len(array_model.KINDS))
+        population.neighbors = np.full((3, 1), -1, dtype=np.int64)
+        population.neighbors[visitor, 0] = host
+        population.neighbors[host, 0] = other
+        population.n_neighbors = np.zeros(3, dtype=np.int64)
+        population.n_neighbors[[visitor, host]] = 1
+        population.state[visitor] = array_model.ASYMPTOMATIC
+        population.step()
+        self.assertEqual(population.prior_visit[host], other)
+        return population.state[host] == array_model.ASYMPTOMATIC
+
+    def test_at_risk_welcome_depends_on_order(self):
+        """As in model.AtRisk.hello, a visitor stepped before the host
+        finds it with no visit pending and is welcomed; one stepped
+        after finds it waiting for the individual it visited today
+        """
+        self.assertTrue(self._welcomed(visitor=0, host=1, other=2))
+        self.assertFalse(self._welcomed(visitor=2, host=1, other=0))
+
+
+class TestMatchesModel(unittest.TestCase):
+    """ArrayPopulation draws its randomness differently from
+    model.Population, so runs differ, but over many seeded runs
+    the mean outcomes should agree within sampling error.
+    """
+    ROWS, COLS = 15, 15
+    DAYS = 100
+    RUNS = 40
+
+    def setUp(self):
+        config.configure(os.path.join(HERE, "contagion.ini"))
+        config.override("Grid", "Rows", self.ROWS)
+        config.override("Grid", "Cols", self.COLS)
+
+    def _model_run(self, seed: int):
+        random.seed(seed)
+        population = model.Population(self.ROWS, self.COLS, seed=seed)
+        population.seed()
+        return outcomes(population, self.DAYS)
+
+    def _array_run(self, seed: int):
+        population = array_model.ArrayPopulation(self.ROWS, self.COLS, seed=seed)
+        population.seed()
+        return outcomes(population, self.DAYS)
+
+    def test_mean_outcomes(self):
+        model_runs = zip(*(self._model_run(seed) for seed in range(self.RUNS)))
+        array_runs = zip(*(self._array_run(seed) for seed in range(self.RUNS)))
+        for name, expected, actual in zip(("peak", "dead", "infected"),
+                                          model_runs, array_runs):
+            # Four standard errors of the difference of the means
+            error = math.sqrt((statistics.variance(expected)
+                               + statistics.variance(actual)) / self.RUNS)
+            self.assertLess(abs(statistics.mean(expected) - statistics.mean(actual)),
+                            4 * error, name)
+            self.assertGreater(statistics.mean(actual), 0, name)
+
+
+if __name__ == "__main__":
+    unittest.main()
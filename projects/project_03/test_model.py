@@ -0,0 +1,113 @@
+"""
+Tests for model.py.
+"""
+import os
+import random
+import unittest
+
+import config
+import model
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def configure(rows: int, cols: int):
+    """The contagion configuration, on a rows x cols grid"""
+    config.configure(os.path.join(HERE, "contagion.ini"))
+    config.override("Grid", "Rows", rows)
+    config.override("Grid", "Cols", cols)
+
+
+class TestNeighbors(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(23)
+        configure(6, 7)
+        self.population = model.Population(6, 7)
+
+    def test_clipped_window(self):
+        """Corners and edges, including column 0, sample only the
+        part of the window inside the grid, and never ourselves
+        """
+        population = self.population
+        for row in range(population.nrows):
+            for col in range(population.ncols):
+                for dist in (1, 2, 10):
+                    top, bottom = max(0, row - dist), min(population.nrows - 1, row + dist)
+                    left, right = max(0, col - dist), min(population.ncols - 1, col + dist)
+                    window = (bottom - top + 1) * (right - left + 1) - 1
+                    for num in (1, 3, 8, 50):
+                        addrs = population.neighbors(num, row, col, dist)
+                        self.assertEqual(len(addrs), min(num, window))
+                        self.assertEqual(len(set(addrs)), len(addrs))
+                        self.assertNotIn((row, col), addrs)
+                        for addr_row, addr_col in addrs:
+                            self.assertTrue(top <= addr_row <= bottom)
+                            self.assertTrue(left <= addr_col <= right)
+
+    def test_whole_window(self):
+        """Asking for more than there are gives the whole window"""
+        addrs = self.population.neighbors(10, 0, 0, 1)
+        self.assertEqual(sorted(addrs), [(0, 1), (1, 0), (1, 1)])
+
+
+def states(population: model.Population):
+    return [cell.state for row in population.cells for cell in row]
+
+
+def rescan(population: model.Population):
+    """Counts of each state, from scratch"""
+    counts = {state: 0 for state in model.Health}
+    for state in states(population):
+        counts[state] += 1
+    return counts
+
+
+class TestStep(unittest.TestCase):
+    """Active-set stepping must give exactly the days that
+    stepping everyone gives, from the same seeds.
+    """
+
+    def population(self, seed: int) -> model.Population:
+        random.seed(seed)
+        population = model.Population(20, 20, seed=seed)
+        population.seed()
+        return population
+
+    def test_active_set_matches_everyone(self):
+        configure(20, 20)
+        for seed in (1, 2, 3):
+            everyone, active = self.population(seed), self.population(seed)
+            self.assertEqual(states(everyone), states(active))
+            changes = 0
+            for day in range(60):
+                before = states(active)
+                everyone.step(everyone=True)
+                active.step()
+                self.assertEqual(states(everyone), states(active),
+                                 f"seed {seed}, day {day}")
+                changes += before != states(active)
+                self.assertEqual(active.counts(), rescan(active))
+                self.assertEqual(everyone.counts(), rescan(everyone))
+            # The epidemic did something worth comparing
+            self.assertGreater(changes, 5)
+
+    def test_at_risk_catch_up(self):
+        """With only AtRisk individuals, dormant ones must catch
+        up on visits they planned while not stepped
+        """
+        configure(20, 20)
+        config.override("Grid", "Proportion_AtRisk", 1.0)
+        config.override("AtRisk", "P_Transmit", 0.9)
+        config.override("AtRisk", "P_Visit", 0.9)
+        everyone, active = self.population(4), self.population(4)
+        for day in range(60):
+            everyone.step(everyone=True)
+            active.step()
+            self.assertEqual(states(everyone), states(active), f"day {day}")
+            self.assertEqual(active.counts(), rescan(active))
+        self.assertLess(active.count_in_state(model.Health.vulnerable), 300)
+
+
+if __name__ == "__main__":
+    unittest.main()